@@ -1,9 +1,11 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import Group, User
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils.safestring import mark_safe
 
-from .models import Category, Comment, Location, Post
+from .models import Category, Comment, ImageJob, Location, Post
 
 
 class PostInline(admin.TabularInline):
@@ -44,6 +46,7 @@ class PostAdmin(admin.ModelAdmin):
         'location',
         'pub_date',
         'is_published',
+        'comment_count',
         'image_of_post'
     )
     list_editable = ('is_published', 'pub_date')
@@ -55,14 +58,62 @@ class PostAdmin(admin.ModelAdmin):
         'location'
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return queryset.matching(search_term), False
+
     @admin.display(description='Фото')
     def image_of_post(self, obj):
         if obj.image:
             return mark_safe(
-                f'<img src={obj.image.url} width="80" height="60">'
+                f'<img src={obj.get_image_url("thumb")} width="80"'
+                ' height="60" loading="lazy">'
             )
 
 
+def count_by_author(model):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(author=OuterRef('pk')).order_by(
+            ).values('author').annotate(total=Count('pk')).values('total')
+        ),
+        0,
+    )
+
+
+class CountRangeFilter(admin.SimpleListFilter):
+    ranges = (
+        ('0', 'нет', 0, 1),
+        ('1-9', 'от 1 до 9', 1, 10),
+        ('10-99', 'от 10 до 99', 10, 100),
+        ('100-', '100 и больше', 100, None),
+    )
+
+    def lookups(self, request, model_admin):
+        return [(value, title) for value, title, *_ in self.ranges]
+
+    def queryset(self, request, queryset):
+        for value, _, low, high in self.ranges:
+            if value != self.value():
+                continue
+            bounds = {f'{self.parameter_name}__gte': low}
+            if high is not None:
+                bounds[f'{self.parameter_name}__lt'] = high
+            return queryset.filter(**bounds)
+        return queryset
+
+
+class PostsCountFilter(CountRangeFilter):
+    title = 'кол-во постов'
+    parameter_name = 'posts_count'
+
+
+class CommentsCountFilter(CountRangeFilter):
+    title = 'кол-во комментов'
+    parameter_name = 'comments_count'
+
+
 admin.site.unregister(Group)
 admin.site.unregister(User)
 
@@ -78,14 +129,31 @@ class UserAdmin(BaseUserAdmin):
         'comments_count',
         'is_staff'
     )
+    list_filter = (
+        *BaseUserAdmin.list_filter,
+        PostsCountFilter,
+        CommentsCountFilter,
+    )
+    show_full_result_count = False
 
-    @admin.display(description='Кол-во постов у пользователя')
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            posts_count=count_by_author(Post),
+            comments_count=count_by_author(Comment),
+        )
+
+    @admin.display(
+        description='Кол-во постов у пользователя', ordering='posts_count'
+    )
     def posts_count(self, obj):
-        return obj.posts.count()
+        return obj.posts_count
 
-    @admin.display(description='Кол-во комментов у пользователя')
+    @admin.display(
+        description='Кол-во комментов у пользователя',
+        ordering='comments_count',
+    )
     def comments_count(self, obj):
-        return obj.comments.count()
+        return obj.comments_count
 
 
 @admin.register(Comment)
@@ -97,3 +165,17 @@ class CommentAdmin(admin.ModelAdmin):
     )
     search_fields = ('text',)
     list_filter = ('author', 'post')
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'post',
+        'image',
+        'status',
+        'attempts',
+        'run_after',
+        'error'
+    )
+    list_filter = ('status',)
+    readonly_fields = ('post', 'image', 'locked_at', 'error')
@@ -0,0 +1,183 @@
+import hashlib
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .constants import (
+    CACHE_LOCK_POLL_INTERVAL, CACHE_LOCK_TIMEOUT, CACHE_LOCK_WAIT,
+    CACHE_STALE_TIMEOUT
+)
+from core import locks
+
+GENERATION_KEY = 'blog:generation:{}'
+GLOBAL = 'global'
+FEED = 'feed'
+
+
+def category_scope(slug):
+    return f'category:{slug}'
+
+
+def author_scope(username):
+    return f'author:{username}'
+
+
+def get_generations(*scopes):
+    scopes = (GLOBAL, *scopes)
+    keys = {scope: GENERATION_KEY.format(scope) for scope in scopes}
+    generations = cache.get_many(keys.values())
+    missing = {
+        key: time.time_ns() for key in keys.values()
+        if key not in generations
+    }
+    if missing:
+        cache.set_many(missing, None)
+        generations.update(missing)
+    return {scope: generations[key] for scope, key in keys.items()}
+
+
+def bump_generations(*scopes):
+    for scope in set(scopes):
+        key = GENERATION_KEY.format(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def invalidate(*scopes):
+    bump_generations(*scopes)
+    transaction.on_commit(lambda: bump_generations(*scopes))
+
+
+def get_version(scopes):
+    return '|'.join(
+        f'{scope}={generation}'
+        for scope, generation in get_generations(*scopes).items()
+    )
+
+
+def make_key(prefix, *parts):
+    signature = '|'.join(str(part) for part in parts)
+    digest = hashlib.md5(signature.encode()).hexdigest()
+    return f'{prefix}:{digest}'
+
+
+def make_scoped_key(prefix, scopes, *parts):
+    return make_key(prefix, get_version(scopes), *parts)
+
+
+# Блокировки этого процесса: ключ -> (путь, дескриптор, время взятия).
+held_locks = {}
+held_locks_guard = threading.Lock()
+
+
+def get_lock_path(key):
+    directory = Path(settings.CACHE_LOCK_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f'{hashlib.md5(key.encode()).hexdigest()}.lock'
+
+
+def release_expired_locks():
+    """Снимает блокировки, которые процесс не освободил сам.
+
+    Например, если отрисовка ответа упала после dispatch и обработчик
+    post-render, снимающий блокировку, не вызывался.
+    """
+    deadline = time.monotonic() - CACHE_LOCK_TIMEOUT
+    for key, (path, fd, acquired_at) in list(held_locks.items()):
+        if acquired_at < deadline:
+            del held_locks[key]
+            locks.unlock_path(path, fd)
+
+
+def acquire_lock(key):
+    """Блокировка пересчёта key, общая для процессов на этом сервере.
+
+    Это flock на файле в CACHE_LOCK_DIR: ядро снимает его при завершении
+    процесса. Без fcntl (Windows) используется cache.add, который
+    защищает от одновременного пересчёта только внутри одного кэша.
+    """
+    if not locks.SUPPORTED:
+        return cache.add(f'{key}:lock', True, CACHE_LOCK_TIMEOUT)
+    with held_locks_guard:
+        release_expired_locks()
+        if key in held_locks:
+            return False
+        path = get_lock_path(key)
+        fd = locks.try_lock_path(path)
+        if fd is None:
+            return False
+        held_locks[key] = (path, fd, time.monotonic())
+        return True
+
+
+def release_lock(key):
+    if not locks.SUPPORTED:
+        cache.delete(f'{key}:lock')
+        return
+    with held_locks_guard:
+        held = held_locks.pop(key, None)
+        if held is not None:
+            locks.unlock_path(*held[:2])
+
+
+def set_entry(key, version, value, timeout):
+    cache.set(
+        key,
+        {
+            'version': version,
+            'fresh_until': time.time() + timeout,
+            'value': value,
+        },
+        timeout + CACHE_STALE_TIMEOUT,
+    )
+
+
+def is_fresh(entry, version):
+    return entry['version'] == version and entry['fresh_until'] > time.time()
+
+
+def wait_for_entry(key):
+    deadline = time.monotonic() + CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(CACHE_LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def get_entry(key, version):
+    """Запись кэша и признак того, что вызывающему нужно её обновить.
+
+    Обновляет только получивший блокировку: он сохраняет значение через
+    set_entry и снимает блокировку через release_lock. Остальные получают
+    устаревшую запись, а если записи нет — ждут её до CACHE_LOCK_WAIT
+    секунд и получают None, если она так и не появилась.
+    """
+    entry = cache.get(key)
+    if entry is not None and is_fresh(entry, version):
+        return entry, False
+    if acquire_lock(key):
+        return entry, True
+    if entry is None:
+        entry = wait_for_entry(key)
+    return entry, False
+
+
+def get_or_regenerate(key, version, timeout, regenerate):
+    """Значение из кэша с единственным пересчётом на все процессы."""
+    entry, locked = get_entry(key, version)
+    if not locked:
+        return regenerate() if entry is None else entry['value']
+    try:
+        value = regenerate()
+        set_entry(key, version, value, timeout)
+    finally:
+        release_lock(key)
+    return value
@@ -1,5 +1,36 @@
 TITLE_MAX_LENGTH = 256
 PRESENTATION_MAX_LENGTH = 20
+EXCERPT_WORDS = 10
 POSTS_ON_LIST = 10
+POSTS_COUNT_CACHE_TIMEOUT = 30
+POSTS_COUNT_APPROXIMATE_AFTER = POSTS_ON_LIST * 100
+PAGE_CACHE_TIMEOUT = 60
+CACHE_STALE_TIMEOUT = 600
+CACHE_LOCK_TIMEOUT = 10
+CACHE_LOCK_WAIT = 2
+CACHE_LOCK_POLL_INTERVAL = 0.05
+LOOKUP_CACHE_TIMEOUT = 60
+REGISTRY_CHECK_INTERVAL = 5
 COMMENTS_ON_LIST = 5
 ROWS_TEXTAREA = 4
+VISIBILITY_UPDATE_BATCH_SIZE = 500
+SCHEDULER_MAX_SLEEP = 60
+EXCERPT_UPDATE_BATCH_SIZE = 500
+IMAGE_RENDITIONS_DIR = 'posts_images/renditions'
+IMAGE_RENDITIONS = (
+    ('thumb', 160),
+    ('card', 640),
+    ('detail', 1280),
+)
+IMAGE_JPEG_QUALITY = 82
+IMAGE_WEBP_QUALITY = 80
+IMAGE_DISPLAY_SIZES = '(max-width: 40rem) 100vw, 40rem'
+IMAGE_WORKERS = 2
+IMAGE_JOB_MAX_ATTEMPTS = 3
+IMAGE_JOB_RETRY_DELAY = 30
+IMAGE_JOB_LOCK_TIMEOUT = 600
+IMAGE_WORKER_POLL_INTERVAL = 5
+SEARCH_MAX_TERMS = 8
+SEARCH_TITLE_WEIGHT = 10.0
+SEARCH_TEXT_WEIGHT = 1.0
+LOAD_DATA_BATCH_SIZE = 1000
@@ -0,0 +1,79 @@
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .constants import (
+    IMAGE_JPEG_QUALITY, IMAGE_RENDITIONS, IMAGE_RENDITIONS_DIR,
+    IMAGE_WEBP_QUALITY
+)
+
+RENDITION_FORMATS = (
+    ('jpeg', 'JPEG', 'jpg', IMAGE_JPEG_QUALITY),
+    ('webp', 'WEBP', 'webp', IMAGE_WEBP_QUALITY),
+)
+
+
+def get_rendition_name(name, size, extension):
+    stem = posixpath.splitext(posixpath.basename(name))[0]
+    return posixpath.join(IMAGE_RENDITIONS_DIR, f'{stem}_{size}.{extension}')
+
+
+def open_image(image):
+    largest = max(bound for _, bound in IMAGE_RENDITIONS)
+    with image.storage.open(image.name) as source:
+        with Image.open(source) as picture:
+            picture.draft('RGB', (largest, largest))
+            picture.load()
+            picture = ImageOps.exif_transpose(picture)
+            if picture.mode != 'RGB':
+                return picture.convert('RGB')
+            return picture.copy()
+
+
+def make_renditions(image):
+    """Сохраняет уменьшенные копии фото в JPEG и WebP рядом с оригиналом.
+
+    Копии поворачиваются по EXIF-ориентации и сохраняются без метаданных.
+    """
+    original = open_image(image)
+    renditions = {
+        'source': image.name,
+        'width': original.width,
+        'height': original.height,
+        'sizes': {},
+    }
+    previous = None
+    for size, bound in IMAGE_RENDITIONS:
+        resized = original.copy()
+        resized.thumbnail((bound, bound), Image.Resampling.LANCZOS)
+        if previous and (previous['width'], previous['height']) == (
+            resized.width, resized.height
+        ):
+            renditions['sizes'][size] = previous
+            continue
+        previous = {'width': resized.width, 'height': resized.height}
+        for key, image_format, extension, quality in RENDITION_FORMATS:
+            buffer = BytesIO()
+            resized.save(buffer, image_format, quality=quality)
+            previous[key] = image.storage.save(
+                get_rendition_name(image.name, size, extension),
+                ContentFile(buffer.getvalue()),
+            )
+        renditions['sizes'][size] = previous
+    return renditions
+
+
+def get_rendition_names(renditions):
+    return {
+        rendition[key]
+        for rendition in renditions.get('sizes', {}).values()
+        for key, *_ in RENDITION_FORMATS
+        if rendition.get(key)
+    }
+
+
+def delete_renditions(renditions, storage, keep=()):
+    for name in get_rendition_names(renditions).difference(keep):
+        storage.delete(name)
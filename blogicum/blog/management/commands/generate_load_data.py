@@ -0,0 +1,291 @@
+import random
+from argparse import ArgumentTypeError
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate, islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils.dateparse import parse_datetime
+from django.utils.text import Truncator
+from django.utils.timezone import is_naive, make_aware, now
+
+from blog.caching import GLOBAL, invalidate
+from blog.constants import EXCERPT_WORDS, LOAD_DATA_BATCH_SIZE
+from blog.models import Category, Comment, Location, Post, User
+
+WORDS = (
+    'блог', 'город', 'дорога', 'горы', 'море', 'река', 'лес', 'поход',
+    'утро', 'вечер', 'осень', 'зима', 'весна', 'лето', 'кофе', 'книга',
+    'музей', 'парк', 'поезд', 'самолёт', 'друзья', 'семья', 'работа',
+    'проект', 'код', 'идея', 'история', 'фото', 'закат', 'рассвет',
+    'путешествие', 'выставка', 'концерт', 'рецепт', 'ужин', 'прогулка',
+    'новости', 'заметки', 'впечатления', 'планы', 'мечта', 'погода',
+)
+PASSWORD = 'load-test-password'
+
+
+def parse_reference_time(value):
+    moment = parse_datetime(value)
+    if moment is None:
+        raise ArgumentTypeError(f'Неверная дата и время: {value}')
+    return make_aware(moment) if is_naive(moment) else moment
+
+
+def zipf_cum_weights(size, exponent):
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, size + 1)
+    ))
+
+
+def max_pk(model):
+    return model.objects.aggregate(pk=Max('pk'))['pk'] or 0
+
+
+@contextmanager
+def keep_created_at(*models):
+    """Не даёт auto_now_add перезаписать сгенерированные даты."""
+    fields = [model._meta.get_field('created_at') for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, публикациями и '
+        'комментариями для нагрузочного тестирования. Одинаковые --seed '
+        'и --now дают одинаковые данные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--comments', type=int, default=1_000_000)
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--locations', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--now',
+            type=parse_reference_time,
+            help='Момент, от которого отсчитываются даты, в формате ISO '
+                 '8601; по умолчанию текущее время. Задайте его, чтобы '
+                 'повторить те же данные.',
+        )
+        parser.add_argument(
+            '--prefix',
+            default='load',
+            help='Префикс имён пользователей и идентификаторов категорий.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=LOAD_DATA_BATCH_SIZE,
+            help='Количество строк в одном bulk_create и одной транзакции.',
+        )
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.1,
+            help='Показатель распределения Ципфа для авторов, категорий '
+                 'и популярности публикаций.',
+        )
+        parser.add_argument(
+            '--future-share',
+            type=float,
+            default=0.05,
+            help='Доля отложенных публикаций.',
+        )
+        parser.add_argument(
+            '--unpublished-share',
+            type=float,
+            default=0.05,
+            help='Доля снятых с публикации постов и категорий.',
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        self.visible_until = now()
+        self.now = (options['now'] or self.visible_until).replace(
+            microsecond=0
+        )
+        if options['posts'] and not (
+            options['users'] and options['categories']
+        ):
+            raise CommandError(
+                'Для публикаций нужны пользователи и категории.'
+            )
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(
+                f'Данные с префиксом «{prefix}» уже есть, укажите другой '
+                '--prefix.'
+            )
+        user_ids = self.create_users()
+        category_ids, published_categories = self.create_categories()
+        location_ids = self.create_locations()
+        with keep_created_at(Post, Comment):
+            post_ids = self.create_posts(
+                user_ids, category_ids, published_categories, location_ids
+            )
+            self.create_comments(user_ids, post_ids)
+        invalidate(GLOBAL)
+
+    def words(self, low, high):
+        return ' '.join(self.rng.choices(WORDS, k=self.rng.randint(low, high)))
+
+    def past_date(self, days=730):
+        return self.now - timedelta(seconds=self.rng.randint(0, days * 86400))
+
+    def bulk_create(self, model, objects, total):
+        batch_size = self.options['batch_size']
+        objects = iter(objects)
+        created = 0
+        while batch := list(islice(objects, batch_size)):
+            with transaction.atomic():
+                model.objects.bulk_create(batch, batch_size=batch_size)
+            created += len(batch)
+            self.stdout.write(
+                f'\r{model._meta.verbose_name_plural}: {created}/{total}',
+                ending='',
+            )
+        self.stdout.write('')
+
+    def create_users(self):
+        total = self.options['users']
+        start = max_pk(User) + 1
+        password = make_password(PASSWORD)
+        prefix = self.options['prefix']
+        self.bulk_create(User, (
+            User(
+                pk=start + i,
+                username=f'{prefix}_{i}',
+                password=password,
+                date_joined=self.past_date(),
+            )
+            for i in range(total)
+        ), total)
+        return list(range(start, start + total))
+
+    def create_categories(self):
+        total = self.options['categories']
+        start = max_pk(Category) + 1
+        unpublished = set(self.rng.sample(
+            range(total), int(total * self.options['unpublished_share'])
+        ))
+        prefix = self.options['prefix']
+        self.bulk_create(Category, (
+            Category(
+                pk=start + i,
+                title=self.words(1, 3).capitalize(),
+                description=self.words(5, 20),
+                slug=f'{prefix}-{i}',
+                is_published=i not in unpublished,
+            )
+            for i in range(total)
+        ), total)
+        return (
+            list(range(start, start + total)),
+            {start + i for i in range(total) if i not in unpublished},
+        )
+
+    def create_locations(self):
+        total = self.options['locations']
+        start = max_pk(Location) + 1
+        self.bulk_create(Location, (
+            Location(pk=start + i, name=self.words(1, 2).capitalize())
+            for i in range(total)
+        ), total)
+        return list(range(start, start + total))
+
+    def create_posts(self, user_ids, category_ids, published_categories,
+                     location_ids):
+        total = self.options['posts']
+        skew = self.options['skew']
+        start = max_pk(Post) + 1
+        authors = self.rng.sample(user_ids, len(user_ids))
+        author_weights = zipf_cum_weights(len(authors), skew)
+        categories = self.rng.sample(category_ids, len(category_ids))
+        category_weights = zipf_cum_weights(len(categories), skew)
+        self.comment_counts = [0] * total
+        for index in self.rng.choices(
+            range(total),
+            cum_weights=zipf_cum_weights(total, skew),
+            k=self.options['comments'],
+        ):
+            self.comment_counts[index] += 1
+        self.rng.shuffle(self.comment_counts)
+
+        def make_post(i):
+            if self.rng.random() < self.options['future_share']:
+                pub_date = self.now + timedelta(
+                    seconds=self.rng.randint(60, 30 * 86400)
+                )
+            else:
+                pub_date = self.past_date()
+            category_id = self.rng.choices(
+                categories, cum_weights=category_weights
+            )[0]
+            is_published = (
+                self.rng.random() >= self.options['unpublished_share']
+            )
+            text = self.words(20, 200)
+            return Post(
+                pk=start + i,
+                title=self.words(2, 6).capitalize(),
+                text=text,
+                excerpt=Truncator(text).words(EXCERPT_WORDS, truncate=' …'),
+                pub_date=pub_date,
+                created_at=min(pub_date, self.now),
+                author_id=self.rng.choices(
+                    authors, cum_weights=author_weights
+                )[0],
+                category_id=category_id,
+                location_id=(
+                    self.rng.choice(location_ids)
+                    if location_ids and self.rng.random() < 0.7 else None
+                ),
+                is_published=is_published,
+                is_visible=(
+                    is_published
+                    and pub_date <= self.visible_until
+                    and category_id in published_categories
+                ),
+                comment_count=self.comment_counts[i],
+            )
+
+        self.post_dates = {}
+        posts = (make_post(i) for i in range(total))
+        self.bulk_create(Post, self.remember_dates(posts), total)
+        return list(range(start, start + total))
+
+    def remember_dates(self, posts):
+        for post in posts:
+            self.post_dates[post.pk] = post.created_at
+            yield post
+
+    def create_comments(self, user_ids, post_ids):
+        total = sum(self.comment_counts)
+
+        def make_comments():
+            for post_id, count in zip(post_ids, self.comment_counts):
+                post_date = self.post_dates[post_id]
+                age = max(int((self.now - post_date).total_seconds()), 1)
+                for _ in range(count):
+                    yield Comment(
+                        post_id=post_id,
+                        author_id=self.rng.choice(user_ids),
+                        text=self.words(3, 40),
+                        created_at=post_date + timedelta(
+                            seconds=self.rng.randint(0, age)
+                        ),
+                    )
+
+        self.bulk_create(Comment, make_comments(), total)
@@ -0,0 +1,161 @@
+import multiprocessing
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from django.utils.timezone import now
+
+from blog.caching import invalidate
+from blog.constants import (
+    IMAGE_JOB_LOCK_TIMEOUT, IMAGE_JOB_MAX_ATTEMPTS, IMAGE_JOB_RETRY_DELAY,
+    IMAGE_WORKER_POLL_INTERVAL, IMAGE_WORKERS
+)
+from blog.images import delete_renditions, get_rendition_names, make_renditions
+from blog.models import ImageJob, Post
+from blog.signals import get_post_scopes
+
+
+def process_job(job, max_attempts):
+    post = Post.objects.filter(pk=job.post_id).only(
+        'pk', 'image', 'image_renditions', 'category', 'author'
+    ).first()
+    if post is None or (post.image.name or '') != job.image:
+        ImageJob.objects.current(job).delete()
+        return
+    try:
+        renditions = make_renditions(post.image) if job.image else {}
+    except Exception as error:
+        fail_job(job, post, error, max_attempts)
+        return
+    updated = Post.objects.filter(pk=post.pk, image=job.image).update(
+        image_renditions=renditions, updated_at=now()
+    )
+    if updated:
+        delete_renditions(
+            post.image_renditions,
+            post.image.storage,
+            keep=get_rendition_names(renditions),
+        )
+        invalidate(*get_post_scopes(post))
+    else:
+        delete_renditions(renditions, post.image.storage)
+    ImageJob.objects.current(job).delete()
+
+
+def fail_job(job, post, error, max_attempts):
+    if job.attempts < max_attempts:
+        ImageJob.objects.current(job).update(
+            status=ImageJob.Status.PENDING,
+            run_after=now() + timedelta(
+                seconds=IMAGE_JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            ),
+            error=repr(error),
+        )
+        return
+    ImageJob.objects.current(job).update(
+        status=ImageJob.Status.FAILED, error=repr(error)
+    )
+    if Post.objects.filter(pk=post.pk, image=job.image).update(
+        image_renditions={'source': job.image, 'sizes': {}},
+        updated_at=now(),
+    ):
+        invalidate(*get_post_scopes(post))
+
+
+def run_worker(loop, poll_interval, max_attempts, lock_timeout):
+    processed = 0
+    while True:
+        close_old_connections()
+        job = ImageJob.objects.claim(lock_timeout)
+        if job is None:
+            if not loop:
+                return processed
+            time.sleep(poll_interval)
+            continue
+        process_job(job, max_attempts)
+        processed += 1
+
+
+class Command(BaseCommand):
+    help = (
+        'Готовит уменьшенные копии загруженных фото из очереди: '
+        'поворачивает по EXIF, удаляет метаданные и сохраняет JPEG и WebP.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=IMAGE_WORKERS,
+            help='Количество параллельных процессов обработки.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Работать постоянно, ожидая новые задачи.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=IMAGE_WORKER_POLL_INTERVAL,
+            help='Пауза между проверками пустой очереди в секундах.',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=IMAGE_JOB_MAX_ATTEMPTS,
+            help='Сколько раз пытаться обработать фото до отказа.',
+        )
+        parser.add_argument(
+            '--lock-timeout',
+            type=float,
+            default=IMAGE_JOB_LOCK_TIMEOUT,
+            help='Через сколько секунд зависшая задача снова '
+                 'становится доступной.',
+        )
+        parser.add_argument(
+            '--enqueue-missing',
+            action='store_true',
+            help='Поставить в очередь фото, для которых нет '
+                 'уменьшенных копий, например после loaddata.',
+        )
+
+    def handle(self, *args, workers, enqueue_missing, **options):
+        if enqueue_missing:
+            self.enqueue_missing()
+        worker_options = (
+            options['loop'],
+            options['poll_interval'],
+            options['max_attempts'],
+            options['lock_timeout'],
+        )
+        if workers <= 1:
+            processed = run_worker(*worker_options)
+            self.stdout.write(f'Обработано задач: {processed}')
+            return
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        processes = [
+            context.Process(target=run_worker, args=worker_options)
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        failed = ImageJob.objects.filter(
+            status=ImageJob.Status.FAILED
+        ).count()
+        self.stdout.write(f'Задач с ошибкой: {failed}')
+
+    def enqueue_missing(self):
+        posts = Post.objects.exclude(image='').exclude(
+            image_job__isnull=False
+        ).only('pk', 'image', 'image_renditions')
+        enqueued = 0
+        for post in posts.iterator():
+            if post.get_renditions() is None:
+                ImageJob.objects.enqueue(post)
+                enqueued += 1
+        self.stdout.write(f'Поставлено в очередь фото: {enqueued}')
@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils.timezone import now
+
+from blog.caching import FEED, author_scope, category_scope, invalidate
+from blog.constants import SCHEDULER_MAX_SLEEP
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Открывает доступ к отложенным публикациям, время которых '
+        'наступило. Публикации скрываются сразу при сохранении их самих '
+        'или их категорий.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Работать постоянно, просыпаясь ко времени '
+                 'следующей отложенной публикации.',
+        )
+        parser.add_argument(
+            '--max-sleep',
+            type=float,
+            default=SCHEDULER_MAX_SLEEP,
+            help='Наибольшая пауза между проверками в секундах.',
+        )
+
+    def handle(self, *args, loop, max_sleep, **options):
+        while True:
+            close_old_connections()
+            self.refresh()
+            if not loop:
+                return
+            time.sleep(self.get_sleep_time(max_sleep))
+
+    def refresh(self):
+        changed = Post.objects.publish_scheduled()
+        if not changed:
+            return
+        scopes = {FEED}
+        for _, slug, username in changed:
+            scopes.update((category_scope(slug), author_scope(username)))
+        invalidate(*scopes)
+        self.stdout.write(f'Обновлена видимость публикаций: {len(changed)}')
+
+    def get_sleep_time(self, max_sleep):
+        next_pub_date = Post.objects.next_pub_date()
+        if next_pub_date is None:
+            return max_sleep
+        return min(max_sleep, max((next_pub_date - now()).total_seconds(), 0))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
+from blog.constants import EXCERPT_UPDATE_BATCH_SIZE
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Заново рассчитывает анонсы публикаций для списков.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=EXCERPT_UPDATE_BATCH_SIZE,
+            help='Количество публикаций, обновляемых одним запросом.',
+        )
+
+    def handle(self, *args, batch_size, **options):
+        updated = 0
+        batch = []
+        posts = Post.objects.only('pk', 'text', 'excerpt').order_by('pk')
+        for post in posts.iterator(chunk_size=batch_size):
+            excerpt = post.get_excerpt()
+            if excerpt == post.excerpt:
+                continue
+            post.excerpt = excerpt
+            post.updated_at = now()
+            batch.append(post)
+            if len(batch) == batch_size:
+                Post.objects.bulk_update(batch, ('excerpt', 'updated_at'))
+                updated += len(batch)
+                batch = []
+        if batch:
+            Post.objects.bulk_update(batch, ('excerpt', 'updated_at'))
+            updated += len(batch)
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено анонсов публикаций: {updated}'
+        ))
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.16 on 2026-10-18 18:14
+
+from django.db import migrations, models
+from django.utils.timezone import now
+
+
+def fill_is_visible(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(
+        is_published=True,
+        pub_date__lte=now(),
+        category__is_published=True,
+    ).update(is_visible=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='is_visible',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Доступна читателям'),
+        ),
+        migrations.RunPython(fill_is_visible, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['is_visible', 'pub_date'], name='post_visible_pub_date_idx'),
+        ),
+    ]
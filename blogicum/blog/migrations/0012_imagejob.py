@@ -0,0 +1,54 @@
+# Generated by Django 3.2.16 on 2026-10-18 18:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def enqueue_images(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    ImageJob = apps.get_model('blog', 'ImageJob')
+    ImageJob.objects.bulk_create(
+        (
+            ImageJob(post_id=pk, image=image)
+            for pk, image in Post.objects.exclude(image='').values_list(
+                'pk', 'image'
+            )
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_image_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+                ('image', models.CharField(blank=True, max_length=100, verbose_name='Файл фото')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('processing', 'Обрабатывается'), ('failed', 'Ошибка')], default='pending', max_length=16, verbose_name='Состояние')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попытки')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Запустить после')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Взята в работу')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='image_job', to='blog.post', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'обработка фото',
+                'verbose_name_plural': 'Обработка фото',
+                'ordering': ('created_at',),
+                'abstract': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='imagejob',
+            index=models.Index(fields=['status', 'run_after'], name='imagejob_status_run_after_idx'),
+        ),
+        migrations.RunPython(enqueue_images, migrations.RunPython.noop),
+    ]
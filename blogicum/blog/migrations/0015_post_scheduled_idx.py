@@ -0,0 +1,17 @@
+# Generated by Django 3.2.16 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_visible', False)), fields=['pub_date'], name='post_scheduled_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.16 on 2026-10-18 19:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_post_scheduled_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_category_visible_idx',
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['category', 'pub_date'], name='post_category_pub_date_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.16 on 2026-10-18 19:25
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_post_category_pub_date_idx'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='category',
+            options={'ordering': ('created_at',), 'verbose_name': 'категория', 'verbose_name_plural': 'Категории'},
+        ),
+        migrations.AlterModelOptions(
+            name='location',
+            options={'ordering': ('created_at',), 'verbose_name': 'местоположение', 'verbose_name_plural': 'Местоположения'},
+        ),
+    ]
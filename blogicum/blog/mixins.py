@@ -1,19 +1,44 @@
+from datetime import datetime
+
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.shortcuts import redirect
+from django.core.cache import caches
+from django.db.models import Max, Sum
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
 
+from .caching import (
+    FEED, get_entry, get_version, make_key, make_scoped_key, release_lock,
+    set_entry
+)
+from .constants import (
+    PAGE_CACHE_TIMEOUT, POSTS_COUNT_APPROXIMATE_AFTER,
+    POSTS_COUNT_CACHE_TIMEOUT
+)
 from .forms import CommentForm, PostForm
 from .models import Comment, Post
+from .paginators import CachedCountPaginator, InvalidCursor, KeysetPaginator
+from .registry import REGISTRIES
 
 
 class OnlyAuthorMixin(UserPassesTestMixin):
 
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_author_object'):
+            self._author_object = super().get_object()
+        return self._author_object
+
     def test_func(self):
-        return self.get_object().author == self.request.user
+        return self.get_object().author_id == self.request.user.pk
 
 
 class PostMixin(OnlyAuthorMixin, LoginRequiredMixin):
     model = Post
+    queryset = Post.objects.select_related('location')
     pk_url_kwarg = 'post_id'
     template_name = 'blog/create.html'
     form_class = PostForm
@@ -42,3 +67,232 @@ class CommentMixin(LoginRequiredMixin):
             'blog:post_detail',
             kwargs={'post_id': self.kwargs['post_id']}
         )
+
+
+class KeysetPaginationMixin:
+    cursor_kwarg = 'cursor'
+    keyset_paginator_class = KeysetPaginator
+
+    def paginate_queryset(self, queryset, page_size):
+        keyset_paginator = self.keyset_paginator_class(queryset, page_size)
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        if cursor is None:
+            paginator, page, object_list, is_paginated = (
+                super().paginate_queryset(queryset, page_size)
+            )
+            if page.has_next():
+                page.next_cursor = keyset_paginator.next_cursor(page[-1])
+            return paginator, page, page.object_list, is_paginated
+        try:
+            page = keyset_paginator.page(cursor)
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        return (
+            keyset_paginator, page, page.object_list, page.has_other_pages()
+        )
+
+
+class CacheScopeMixin:
+
+    def get_cache_scopes(self):
+        return (FEED,)
+
+
+class CachedCountMixin(CacheScopeMixin):
+    paginator_class = CachedCountPaginator
+    count_timeout = POSTS_COUNT_CACHE_TIMEOUT
+    count_approximate_after = POSTS_COUNT_APPROXIMATE_AFTER
+
+    def get_visibility(self):
+        return 'published'
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        return self.paginator_class(
+            queryset,
+            per_page,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            count_cache_key=make_scoped_key(
+                'blog:count',
+                self.get_cache_scopes(),
+                type(self).__name__,
+                self.get_visibility(),
+            ),
+            count_timeout=self.count_timeout,
+            approximate_after=self.count_approximate_after,
+            **kwargs
+        )
+
+
+class AnonymousPageCacheMixin(CacheScopeMixin):
+    """Кэш страниц для анонимных пользователей.
+
+    Устаревшую страницу пересчитывает один процесс, а остальные, пока он
+    это делает, отдают прежнюю версию. Запросы с параметрами, которых нет
+    в page_cache_params, в кэш не попадают.
+    """
+
+    page_cache_timeout = PAGE_CACHE_TIMEOUT
+    page_cache_params = ('page', 'cursor')
+    cached_headers = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+
+    def get_page_cache_key(self, request):
+        params = request.GET
+        if any(
+            name not in self.page_cache_params or len(values) > 1
+            for name, values in params.lists()
+        ):
+            return None
+        return make_key(
+            'blog:page', type(self).__name__, request.path,
+            *sorted(params.items()),
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        key = None
+        if request.method == 'GET' and not request.user.is_authenticated:
+            key = self.get_page_cache_key(request)
+        if key is None:
+            return super().dispatch(request, *args, **kwargs)
+        version = get_version(self.get_cache_scopes())
+        entry, locked = get_entry(key, version)
+        if not locked:
+            if entry is not None:
+                return self.get_cached_response(request, *entry['value'])
+            return super().dispatch(request, *args, **kwargs)
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        except BaseException:
+            release_lock(key)
+            raise
+        if response.status_code != 200 or not hasattr(response, 'render'):
+            release_lock(key)
+            return response
+
+        def store(rendered):
+            set_entry(key, version, (rendered.content, {
+                header: rendered[header] for header in self.cached_headers
+                if rendered.has_header(header)
+            }), self.page_cache_timeout)
+            release_lock(key)
+
+        response.add_post_render_callback(store)
+        return response
+
+    def get_cached_response(self, request, content, headers):
+        response = HttpResponse(content)
+        for header, value in headers.items():
+            response[header] = value
+        return get_conditional_response(
+            request,
+            etag=response.get('ETag'),
+            last_modified=parse_http_date_safe(response.get('Last-Modified')),
+            response=response,
+        )
+
+
+class ConditionalGetMixin(CacheScopeMixin):
+    """Отвечает 304 Not Modified, если страница не менялась.
+
+    Валидатор считается одним запросом по публикациям страницы, без
+    отрисовки шаблона. В ETag также входят поколения кэша (состав
+    списков, имена авторов), пользователь и CSRF-cookie.
+
+    Last-Modified отдают только страницы с send_last_modified: в списках
+    наибольший updated_at не растёт, когда публикацию удаляют или
+    скрывают, и клиент с одним If-Modified-Since получил бы устаревшую
+    страницу.
+    """
+
+    send_last_modified = False
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        state = self.get_page_state()
+        if state is None:
+            return super().dispatch(request, *args, **kwargs)
+        etag = quote_etag(make_scoped_key(
+            'page',
+            self.get_cache_scopes(),
+            *state.values(),
+            request.user.pk,
+            request.META.get('CSRF_COOKIE', ''),
+        ))
+        dates = [
+            value for value in state.values() if isinstance(value, datetime)
+        ]
+        last_modified = None
+        if self.send_last_modified and dates:
+            last_modified = int(max(dates).timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response.setdefault('ETag', etag)
+            if last_modified is not None:
+                response.setdefault('Last-Modified', http_date(last_modified))
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get_page_queryset(self):
+        queryset = self.get_queryset()
+        page_size = self.get_paginate_by(queryset)
+        cursor_kwarg = getattr(self, 'cursor_kwarg', None)
+        cursor = cursor_kwarg and self.request.GET.get(cursor_kwarg)
+        if cursor:
+            try:
+                return self.keyset_paginator_class(
+                    queryset, page_size
+                ).page_queryset(cursor)
+            except InvalidCursor:
+                return None
+        try:
+            page = int(self.request.GET.get(self.page_kwarg) or 1)
+        except ValueError:
+            return None
+        if page < 1:
+            return None
+        return queryset[(page - 1) * page_size:page * page_size]
+
+    def get_page_state(self):
+        queryset = self.get_page_queryset()
+        if queryset is None:
+            return None
+        return {
+            **queryset.aggregate(
+                updated_at=Max('updated_at'),
+                comments=Sum('comment_count'),
+                ids=Sum('pk'),
+            ),
+            **{
+                f'{name}_updated_at': registry.get_updated_at()
+                for name, registry in REGISTRIES.items()
+            },
+        }
+
+
+class MemoizedLookupMixin:
+    lookup_cache_alias = 'local'
+    lookup_cache_timeout = None
+
+    def get_memoized_object(self, queryset, **lookup):
+        key = (queryset.model._meta.label, *sorted(lookup.items()))
+        memo = self.__dict__.setdefault('_memoized_objects', {})
+        if key not in memo:
+            memo[key] = self.lookup_object(queryset, key, lookup)
+        return memo[key]
+
+    def lookup_object(self, queryset, key, lookup):
+        if self.lookup_cache_timeout is None:
+            return get_object_or_404(queryset, **lookup)
+        process_cache = caches[self.lookup_cache_alias]
+        cache_key = make_scoped_key('blog:lookup', (), *key)
+        obj = process_cache.get(cache_key)
+        if obj is None:
+            obj = get_object_or_404(queryset, **lookup)
+            process_cache.set(cache_key, obj, self.lookup_cache_timeout)
+        return obj
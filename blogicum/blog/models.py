@@ -1,16 +1,29 @@
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
-from django.db import models
-from django.db.models import Count
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
 from django.urls import reverse
-from django.utils.timezone import now
+from django.utils.text import Truncator
+from django.utils.timezone import is_naive, make_aware, now
 
-from .constants import TITLE_MAX_LENGTH, PRESENTATION_MAX_LENGTH
-from core.models import CreatedAtModel, IsPublishedCreatedAtModel
+from .constants import (
+    EXCERPT_WORDS, IMAGE_JOB_LOCK_TIMEOUT, PRESENTATION_MAX_LENGTH,
+    SEARCH_TEXT_WEIGHT, SEARCH_TITLE_WEIGHT, TITLE_MAX_LENGTH,
+    VISIBILITY_UPDATE_BATCH_SIZE
+)
+from .registry import RegistryIterable
+from .search import SEARCH_TABLE, build_match_query
+from core.models import (
+    CreatedAtModel, IsPublishedCreatedAtModel, UpdatedAtModel
+)
 
 User = get_user_model()
 
 
-class Category(IsPublishedCreatedAtModel):
+class Category(IsPublishedCreatedAtModel, UpdatedAtModel):
     title = models.CharField('Заголовок', max_length=TITLE_MAX_LENGTH)
     description = models.TextField('Описание')
     slug = models.SlugField(
@@ -30,7 +43,7 @@ class Category(IsPublishedCreatedAtModel):
         return self.title[:PRESENTATION_MAX_LENGTH]
 
 
-class Location(IsPublishedCreatedAtModel):
+class Location(IsPublishedCreatedAtModel, UpdatedAtModel):
     name = models.CharField('Название места', max_length=TITLE_MAX_LENGTH)
 
     class Meta(IsPublishedCreatedAtModel.Meta):
@@ -42,22 +55,134 @@ class Location(IsPublishedCreatedAtModel):
 
 
 class PublishedManager(models.QuerySet):
-    def filter_posts(self):
-        return self.filter(
+    @staticmethod
+    def published():
+        return Q(
             is_published=True,
             pub_date__lte=now(),
             category__is_published=True
         )
 
+    def filter_posts(self):
+        return self.filter(is_visible=True)
+
+    def visible_to(self, user):
+        if not user.is_authenticated:
+            return self.filter_posts()
+        return self.filter(Q(author=user) | Q(is_visible=True))
+
+    def refresh_visibility(self):
+        changed = []
+        for is_visible, posts in (
+            (True, self.filter(self.published(), is_visible=False)),
+            (False, self.filter(is_visible=True).exclude(self.published())),
+        ):
+            rows = list(posts.values_list(
+                'pk', 'category__slug', 'author__username'
+            ))
+            for start in range(0, len(rows), VISIBILITY_UPDATE_BATCH_SIZE):
+                batch = rows[start:start + VISIBILITY_UPDATE_BATCH_SIZE]
+                self.model.objects.filter(
+                    pk__in=[pk for pk, _, _ in batch]
+                ).update(is_visible=is_visible, updated_at=now())
+            changed.extend(rows)
+        return changed
+
+    def scheduled(self):
+        """Скрытые публикации, которые откроются в pub_date.
+
+        Запрос идёт по частичному индексу post_scheduled_idx.
+        """
+        return self.filter(
+            is_visible=False,
+            is_published=True,
+            category__is_published=True,
+        ).order_by()
+
+    def publish_scheduled(self):
+        """Открывает доступ к публикациям, время которых наступило.
+
+        Кандидаты читаются до начала транзакции, чтобы не держать
+        блокировку записи во время поиска; в транзакции условия
+        публикации проверяются повторно.
+        """
+        rows = list(self.scheduled().filter(pub_date__lte=now()).values_list(
+            'pk', 'category__slug', 'author__username'
+        ))
+        if not rows:
+            return rows
+        with transaction.atomic():
+            for start in range(0, len(rows), VISIBILITY_UPDATE_BATCH_SIZE):
+                batch = rows[start:start + VISIBILITY_UPDATE_BATCH_SIZE]
+                self.model.objects.filter(
+                    self.published(),
+                    pk__in=[pk for pk, _, _ in batch],
+                    is_visible=False,
+                ).update(is_visible=True, updated_at=now())
+        return rows
+
+    def next_pub_date(self):
+        return self.scheduled().order_by('pub_date').values_list(
+            'pub_date', flat=True
+        ).first()
+
+    def with_registry_relations(self):
+        queryset = self._chain()
+        queryset._iterable_class = RegistryIterable
+        return queryset
+
     def get_posts_comment_count(self):
-        return self.select_related(
-            'category', 'location', 'author'
-        ).annotate(comment_count=Count('comments')).order_by('-pub_date')
+        return self.select_related('author').with_registry_relations(
+        ).order_by('-pub_date', '-pk')
 
+    def get_post_cards(self):
+        return self.get_posts_comment_count().defer('text')
 
-class Post(IsPublishedCreatedAtModel):
+    def search(self, query):
+        match = build_match_query(query)
+        if not match:
+            return self.none()
+        return self.extra(
+            select={'rank': f'bm25({SEARCH_TABLE}, %s, %s)'},
+            select_params=(SEARCH_TITLE_WEIGHT, SEARCH_TEXT_WEIGHT),
+            tables=(SEARCH_TABLE,),
+            where=(
+                f'{SEARCH_TABLE} MATCH %s',
+                f'{SEARCH_TABLE}.rowid = "blog_post"."id"',
+            ),
+            params=(match,),
+        ).order_by('rank', '-pub_date')
+
+    def matching(self, query):
+        match = build_match_query(query)
+        if not match:
+            return self.none()
+        return self.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {SEARCH_TABLE} '
+            f'WHERE {SEARCH_TABLE} MATCH %s',
+            (match,),
+        ))
+
+    def recount_comments(self):
+        actual_count = Coalesce(
+            Subquery(
+                Comment.objects.filter(post=OuterRef('pk')).order_by(
+                ).values('post').annotate(total=Count('pk')).values('total')
+            ),
+            0,
+        )
+        drifted = self.annotate(actual_count=actual_count).exclude(
+            comment_count=F('actual_count')
+        )
+        return self.model.objects.filter(
+            pk__in=drifted.values('pk')
+        ).update(comment_count=actual_count)
+
+
+class Post(IsPublishedCreatedAtModel, UpdatedAtModel):
     title = models.CharField('Заголовок', max_length=TITLE_MAX_LENGTH)
     text = models.TextField('Текст')
+    excerpt = models.TextField('Анонс', blank=True, editable=False)
     pub_date = models.DateTimeField(
         'Дата и время публикации',
         help_text=(
@@ -68,6 +193,7 @@ class Post(IsPublishedCreatedAtModel):
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Автор публикации',
     )
     location = models.ForeignKey(
@@ -81,13 +207,59 @@ class Post(IsPublishedCreatedAtModel):
         Category,
         on_delete=models.SET_NULL,
         null=True,
+        db_index=False,
         verbose_name='Категория',
     )
     image = models.ImageField('Фото', upload_to='posts_images', blank=True)
+    image_renditions = models.JSONField(
+        'Уменьшенные копии фото',
+        default=dict,
+        blank=True,
+        editable=False,
+    )
+    is_visible = models.BooleanField(
+        'Доступна читателям',
+        default=False,
+        editable=False,
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
     objects = PublishedManager.as_manager()
 
+    counter_fields = ('comment_count',)
+    worker_fields = ('image_renditions',)
+    derived_fields = ('is_visible', 'excerpt', 'updated_at')
+
     class Meta:
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('pub_date',),
+                name='post_visible_idx',
+                condition=Q(is_visible=True),
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                name='post_category_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_visible_idx',
+                condition=Q(is_visible=True),
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=('pub_date',),
+                name='post_scheduled_idx',
+                condition=Q(is_visible=False),
+            ),
+        )
         default_related_name = 'posts'
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
@@ -95,6 +267,88 @@ class Post(IsPublishedCreatedAtModel):
     def __str__(self):
         return self.title[:PRESENTATION_MAX_LENGTH]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def get_visibility(self):
+        if not self.is_published or self.pub_date is None:
+            return False
+        pub_date = self.pub_date
+        if is_naive(pub_date):
+            pub_date = make_aware(pub_date)
+        return (
+            pub_date <= now()
+            and self.category_id is not None
+            and self.category.is_published
+        )
+
+    @property
+    def card_version(self):
+        """Всё, от чего зависит карточка публикации в списках."""
+        return (
+            self.updated_at,
+            self.comment_count,
+            self.author.username,
+            self.category and self.category.updated_at,
+            self.location and self.location.updated_at,
+        )
+
+    def get_excerpt(self):
+        return Truncator(self.text).words(EXCERPT_WORDS, truncate=' …')
+
+    def get_saved_image(self):
+        if hasattr(self, '_saved_image'):
+            return self._saved_image
+        return getattr(self, '_loaded_values', {}).get('image') or ''
+
+    def image_changed(self, update_fields=None):
+        if 'image' in self.get_deferred_fields():
+            return False
+        if update_fields is not None and 'image' not in update_fields:
+            return False
+        return (self.image.name or '') != self.get_saved_image()
+
+    def get_renditions(self):
+        if self.image_renditions.get('source') != self.image.name:
+            return None
+        return self.image_renditions.get('sizes', {})
+
+    def get_image_url(self, size):
+        rendition = (self.get_renditions() or {}).get(size)
+        if rendition is None:
+            return self.image.url
+        return self.image.storage.url(rendition['jpeg'])
+
+    def save(self, *args, **kwargs):
+        self.is_visible = self.get_visibility()
+        self.excerpt = self.get_excerpt()
+        image_changed = self.image_changed(kwargs.get('update_fields'))
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {
+                *kwargs['update_fields'], *self.derived_fields
+            }
+        if (
+            not self._state.adding
+            and self.pk is not None
+            and not kwargs.get('force_insert')
+            and kwargs.get('update_fields') is None
+        ):
+            skipped_fields = self.get_deferred_fields().union(
+                self.counter_fields, self.worker_fields
+            )
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in skipped_fields
+            ]
+        super().save(*args, **kwargs)
+        self._saved_image = self.image.name or ''
+        if image_changed:
+            ImageJob.objects.enqueue(self)
+
     def get_absolute_url(self):
         return reverse(
             'blog:profile',
@@ -107,6 +361,7 @@ class Comment(CreatedAtModel):
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Пост',
     )
     author = models.ForeignKey(
@@ -116,6 +371,12 @@ class Comment(CreatedAtModel):
     )
 
     class Meta(CreatedAtModel.Meta):
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_at_idx',
+            ),
+        )
         default_related_name = 'comments'
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
@@ -126,5 +387,93 @@ class Comment(CreatedAtModel):
     def get_absolute_url(self):
         return reverse(
             'blog:post_detail',
-            kwargs={'post_id': self.post.id}
+            kwargs={'post_id': self.post_id}
+        )
+
+
+class ImageJobQuerySet(models.QuerySet):
+    def enqueue(self, post):
+        job, _ = self.update_or_create(
+            post=post,
+            defaults={
+                'image': post.image.name or '',
+                'status': ImageJob.Status.PENDING,
+                'attempts': 0,
+                'run_after': now(),
+                'locked_at': None,
+                'error': '',
+            },
         )
+        return job
+
+    def available(self, lock_timeout=IMAGE_JOB_LOCK_TIMEOUT):
+        current = now()
+        return self.filter(
+            Q(status=ImageJob.Status.PENDING, run_after__lte=current)
+            | Q(
+                status=ImageJob.Status.PROCESSING,
+                locked_at__lt=current - timedelta(seconds=lock_timeout),
+            )
+        ).order_by('run_after')
+
+    def claim(self, lock_timeout=IMAGE_JOB_LOCK_TIMEOUT, candidates=10):
+        for job in self.available(lock_timeout)[:candidates]:
+            locked_at = now()
+            claimed = self.filter(
+                pk=job.pk,
+                image=job.image,
+                status=job.status,
+                attempts=job.attempts,
+            ).update(
+                status=ImageJob.Status.PROCESSING,
+                locked_at=locked_at,
+                attempts=F('attempts') + 1,
+            )
+            if claimed:
+                job.status = ImageJob.Status.PROCESSING
+                job.locked_at = locked_at
+                job.attempts += 1
+                return job
+        return None
+
+    def current(self, job):
+        return self.filter(pk=job.pk, image=job.image)
+
+
+class ImageJob(CreatedAtModel):
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        PROCESSING = 'processing', 'Обрабатывается'
+        FAILED = 'failed', 'Ошибка'
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_job',
+        verbose_name='Пост',
+    )
+    image = models.CharField('Файл фото', max_length=100, blank=True)
+    status = models.CharField(
+        'Состояние',
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    run_after = models.DateTimeField('Запустить после', default=now)
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    error = models.TextField('Ошибка', blank=True)
+    objects = ImageJobQuerySet.as_manager()
+
+    class Meta(CreatedAtModel.Meta):
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after'),
+                name='imagejob_status_run_after_idx',
+            ),
+        )
+        verbose_name = 'обработка фото'
+        verbose_name_plural = 'Обработка фото'
+
+    def __str__(self):
+        return self.image[:PRESENTATION_MAX_LENGTH]
@@ -0,0 +1,167 @@
+import base64
+import binascii
+from collections.abc import Sequence
+from datetime import datetime
+
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class CountedPage(Page):
+
+    def has_next(self):
+        return self.paginator.is_approximate or super().has_next()
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator с кэшируемым и, при необходимости, приближённым COUNT.
+
+    Количество записей считается по запросу без select_related и
+    сортировки. Если задан approximate_after, подсчёт ограничивается этим
+    числом записей, а страницы дальше доступны по курсору.
+    """
+
+    def __init__(self, *args, count_cache_key=None, count_timeout=None,
+                 approximate_after=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_cache_key = count_cache_key
+        self.count_timeout = count_timeout
+        self.approximate_after = approximate_after
+        self.is_approximate = False
+
+    @cached_property
+    def count(self):
+        if self.count_cache_key is not None:
+            cached = cache.get(self.count_cache_key)
+            if cached is not None:
+                count, self.is_approximate = cached
+                return count
+        queryset = self.object_list.select_related(None).order_by()
+        if self.approximate_after is None:
+            count = queryset.count()
+        else:
+            count = queryset[:self.approximate_after + 1].count()
+            self.is_approximate = count > self.approximate_after
+            count = min(count, self.approximate_after)
+        if self.count_cache_key is not None:
+            cache.set(
+                self.count_cache_key,
+                (count, self.is_approximate),
+                self.count_timeout,
+            )
+        return count
+
+    def _get_page(self, *args, **kwargs):
+        return CountedPage(*args, **kwargs)
+
+
+class KeysetPage(Sequence):
+    number = None
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Keyset page of {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Постраничный вывод по ключу (order_field, pk) без OFFSET.
+
+    Курсор хранит направление перехода и ключ граничной записи страницы,
+    поэтому любая страница выбирается одним запросом по индексу.
+    """
+
+    def __init__(self, object_list, per_page, order_field='pub_date'):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.order_field = order_field
+
+    def encode_cursor(self, direction, obj):
+        value = getattr(obj, self.order_field).isoformat()
+        raw = f'{direction}|{value}|{obj.pk}'.encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, value, pk = raw.decode().split('|')
+            if direction not in (NEXT, PREVIOUS):
+                raise ValueError(direction)
+            return direction, datetime.fromisoformat(value), int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise InvalidCursor('Некорректный курсор страницы')
+
+    def next_cursor(self, obj):
+        return self.encode_cursor(NEXT, obj)
+
+    def previous_cursor(self, obj):
+        return self.encode_cursor(PREVIOUS, obj)
+
+    def get_queryset(self, direction, value, pk):
+        field = self.order_field
+        if direction == NEXT:
+            return self.object_list.filter(
+                Q(**{f'{field}__lt': value}) | Q(pk__lt=pk),
+                **{f'{field}__lte': value},
+            ).order_by(f'-{field}', '-pk')
+        return self.object_list.filter(
+            Q(**{f'{field}__gt': value}) | Q(pk__gt=pk),
+            **{f'{field}__gte': value},
+        ).order_by(field, 'pk')
+
+    def page_queryset(self, cursor):
+        """Записи страницы по курсору в виде невыполненного запроса."""
+        return self.get_queryset(*self.decode_cursor(cursor))[:self.per_page]
+
+    def page(self, cursor):
+        direction, value, pk = self.decode_cursor(cursor)
+        queryset = self.get_queryset(direction, value, pk)
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not rows:
+            raise InvalidCursor('На этой странице нет результатов')
+        if direction == PREVIOUS:
+            rows.reverse()
+            return KeysetPage(
+                rows,
+                self,
+                next_cursor=self.next_cursor(rows[-1]),
+                previous_cursor=(
+                    self.previous_cursor(rows[0]) if has_more else None
+                ),
+            )
+        return KeysetPage(
+            rows,
+            self,
+            next_cursor=self.next_cursor(rows[-1]) if has_more else None,
+            previous_cursor=self.previous_cursor(rows[0]),
+        )
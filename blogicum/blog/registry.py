@@ -0,0 +1,91 @@
+import time
+
+from django.apps import apps
+from django.db.models import Count, Max
+from django.db.models.query import ModelIterable
+
+from .caching import GLOBAL, bump_generations, get_generations
+from .constants import REGISTRY_CHECK_INTERVAL
+
+
+class Registry:
+    """Все строки небольшой таблицы в памяти процесса.
+
+    Версией служит поколение GLOBAL кэша: его сбрасывает сохранение и
+    удаление категорий и местоположений. Кэш может быть своим у каждого
+    процесса, поэтому раз в REGISTRY_CHECK_INTERVAL секунд реестр
+    сверяет с базой MAX(updated_at) и COUNT(*) таблицы.
+    """
+
+    def __init__(self, model_label):
+        self.model_label = model_label
+        self.generation = None
+        self.checked_at = 0
+        self.objects = {}
+        self.updated_at = None
+
+    def get_model(self):
+        return apps.get_model(self.model_label)
+
+    def is_outdated(self):
+        state = self.get_model()._base_manager.aggregate(
+            updated_at=Max('updated_at'), count=Count('pk')
+        )
+        return state != {
+            'updated_at': self.updated_at, 'count': len(self.objects)
+        }
+
+    def get_objects(self, reload=False):
+        generation = get_generations()[GLOBAL]
+        if (
+            not reload
+            and generation == self.generation
+            and time.monotonic() - self.checked_at >= REGISTRY_CHECK_INTERVAL
+        ):
+            self.checked_at = time.monotonic()
+            if self.is_outdated():
+                # Изменение из другого процесса: страницы в кэше этого
+                # процесса собраны по старым данным.
+                bump_generations(GLOBAL)
+                generation = get_generations()[GLOBAL]
+        if reload or generation != self.generation:
+            objects = self.get_model()._base_manager.order_by()
+            self.objects = {obj.pk: obj for obj in objects}
+            self.updated_at = max(
+                (obj.updated_at for obj in self.objects.values()),
+                default=None,
+            )
+            self.generation = generation
+            self.checked_at = time.monotonic()
+        return self.objects
+
+    def get_updated_at(self):
+        self.get_objects()
+        return self.updated_at
+
+
+REGISTRIES = {
+    'category': Registry('blog.Category'),
+    'location': Registry('blog.Location'),
+}
+
+
+class RegistryIterable(ModelIterable):
+    """Подставляет связанные объекты из реестров вместо JOIN."""
+
+    def __iter__(self):
+        meta = self.queryset.model._meta
+        fields = {name: meta.get_field(name) for name in REGISTRIES}
+        known = {}
+        for obj in super().__iter__():
+            for name, field in fields.items():
+                pk = getattr(obj, field.attname)
+                if pk is None:
+                    continue
+                if name not in known:
+                    known[name] = REGISTRIES[name].get_objects()
+                if pk not in known[name]:
+                    known[name] = REGISTRIES[name].get_objects(reload=True)
+                if pk in known[name]:
+                    field.set_cached_value(obj, known[name][pk])
+            yield obj
@@ -0,0 +1,73 @@
+import re
+
+from .constants import SEARCH_MAX_TERMS
+
+TERM_RE = re.compile(r'\w+')
+
+
+def build_match_query(query):
+    """Превращает ввод пользователя в безопасное выражение FTS5 MATCH.
+
+    Каждое слово берётся в кавычки, поэтому операторы FTS5 в запросе
+    ищутся как обычный текст; последнее слово ищется как префикс.
+    """
+    terms = TERM_RE.findall(query or '')[:SEARCH_MAX_TERMS]
+    if not terms:
+        return ''
+    return ' '.join(f'"{term}"' for term in terms) + '*'
+
+
+SEARCH_TABLE = 'blog_post_fts'
+
+SEARCH_TRIGGERS = {
+    'blog_post_fts_insert': """
+        CREATE TRIGGER IF NOT EXISTS blog_post_fts_insert
+        AFTER INSERT ON blog_post BEGIN
+            INSERT INTO blog_post_fts(rowid, title, text)
+            VALUES (new.id, new.title, new.text);
+        END
+    """,
+    'blog_post_fts_delete': """
+        CREATE TRIGGER IF NOT EXISTS blog_post_fts_delete
+        AFTER DELETE ON blog_post BEGIN
+            INSERT INTO blog_post_fts(blog_post_fts, rowid, title, text)
+            VALUES ('delete', old.id, old.title, old.text);
+        END
+    """,
+    'blog_post_fts_update': """
+        CREATE TRIGGER IF NOT EXISTS blog_post_fts_update
+        AFTER UPDATE OF title, text ON blog_post
+        WHEN old.title IS NOT new.title OR old.text IS NOT new.text BEGIN
+            INSERT INTO blog_post_fts(blog_post_fts, rowid, title, text)
+            VALUES ('delete', old.id, old.title, old.text);
+            INSERT INTO blog_post_fts(rowid, title, text)
+            VALUES (new.id, new.title, new.text);
+        END
+    """,
+}
+
+
+def restore_search_triggers(connection):
+    """Восстанавливает триггеры индекса после пересоздания blog_post.
+
+    SQLite удаляет триггеры вместе с таблицей, а миграции Django
+    пересоздают её при изменении полей публикации.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name FROM sqlite_master "
+            "WHERE name = %s OR name LIKE 'blog_post_fts_%%'",
+            (SEARCH_TABLE,),
+        )
+        existing = {name for _, name in cursor.fetchall()}
+        if SEARCH_TABLE not in existing:
+            return False
+        missing = set(SEARCH_TRIGGERS).difference(existing)
+        if not missing:
+            return False
+        for name in missing:
+            cursor.execute(SEARCH_TRIGGERS[name])
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"
+        )
+    return True
@@ -0,0 +1,112 @@
+from django.db import connections
+from django.db.models import F
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+from django.utils.timezone import now
+
+from .caching import FEED, GLOBAL, author_scope, category_scope, invalidate
+from .models import Category, Comment, Location, Post, User
+from .search import restore_search_triggers
+
+
+def get_post_scopes(post):
+    loaded_values = getattr(post, '_loaded_values', {})
+    category_ids = {post.category_id, loaded_values.get('category_id')}
+    author_ids = {post.author_id, loaded_values.get('author_id')}
+    slugs = Category.objects.filter(pk__in=category_ids).values_list(
+        'slug', flat=True
+    )
+    usernames = User.objects.filter(pk__in=author_ids).values_list(
+        'username', flat=True
+    )
+    return (
+        FEED,
+        *(category_scope(slug) for slug in slugs),
+        *(author_scope(username) for username in usernames),
+    )
+
+
+def get_comment_scopes(comment):
+    post = Post.objects.filter(pk=comment.post_id).values(
+        'category__slug', 'author__username'
+    ).first()
+    if post is None:
+        return (FEED,)
+    return (
+        FEED,
+        category_scope(post['category__slug']),
+        author_scope(post['author__username']),
+    )
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1, updated_at=now()
+        )
+
+
+@receiver(post_save, sender=Comment)
+def touch_post_of_edited_comment(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(updated_at=now())
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1, updated_at=now()
+    )
+
+
+@receiver(post_save, sender=Comment)
+def invalidate_created_comment_lists(sender, instance, created, **kwargs):
+    if created:
+        invalidate(*get_comment_scopes(instance))
+
+
+@receiver(post_delete, sender=Comment)
+def invalidate_deleted_comment_lists(sender, instance, **kwargs):
+    invalidate(*get_comment_scopes(instance))
+
+
+@receiver((post_save, post_delete), sender=Post)
+def invalidate_post_lists(sender, instance, **kwargs):
+    invalidate(*get_post_scopes(instance))
+
+
+@receiver(post_save, sender=Category)
+def refresh_category_posts_visibility(sender, instance, raw, **kwargs):
+    if not raw:
+        Post.objects.filter(category=instance).refresh_visibility()
+
+
+@receiver(post_delete, sender=Category)
+def hide_uncategorized_posts(sender, instance, **kwargs):
+    Post.objects.filter(category=None).refresh_visibility()
+
+
+@receiver((post_save, post_delete), sender=Category)
+@receiver((post_save, post_delete), sender=Location)
+def invalidate_all_lists(sender, instance, **kwargs):
+    invalidate(GLOBAL)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_lists(sender, instance, created, update_fields,
+                          **kwargs):
+    if created or update_fields == frozenset(('last_login',)):
+        return
+    invalidate(GLOBAL, author_scope(instance.username))
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user_lists(sender, instance, **kwargs):
+    invalidate(GLOBAL, author_scope(instance.username))
+
+
+@receiver(post_migrate)
+def restore_post_search_triggers(sender, using, **kwargs):
+    if sender.name == 'blog' and connections[using].vendor == 'sqlite':
+        restore_search_triggers(connections[using])
@@ -0,0 +1,55 @@
+from django import template
+from django.core.cache.utils import make_template_fragment_key
+from django.template.base import token_kwargs
+
+from blog.caching import get_or_regenerate
+
+register = template.Library()
+
+
+class StaleCacheNode(template.Node):
+
+    def __init__(self, nodelist, timeout, fragment_name, vary_on, version):
+        self.nodelist = nodelist
+        self.timeout = timeout
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+        self.version = version
+
+    def render(self, context):
+        key = make_template_fragment_key(
+            self.fragment_name,
+            [var.resolve(context) for var in self.vary_on],
+        )
+        return get_or_regenerate(
+            key,
+            str(self.version.resolve(context)),
+            self.timeout.resolve(context),
+            lambda: self.nodelist.render(context),
+        )
+
+
+@register.tag
+def stale_cache(parser, token):
+    """Кэш фрагмента, который не пересчитывают одновременно.
+
+    {% stale_cache timeout name [vary_on ...] version=expr %} хранит
+    фрагмент под ключом из name и vary_on; при смене version его
+    пересчитывает один запрос, а остальные выводят прежний вариант.
+    """
+    nodelist = parser.parse(('endstale_cache',))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    version = token_kwargs(bits[-1:], parser)
+    if len(bits) < 4 or 'version' not in version:
+        raise template.TemplateSyntaxError(
+            f'Тег {bits[0]} ожидает срок хранения, имя фрагмента и '
+            'version=... последним аргументом.'
+        )
+    return StaleCacheNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        bits[2],
+        [parser.compile_filter(bit) for bit in bits[3:-1]],
+        version['version'],
+    )
@@ -0,0 +1,58 @@
+from django import template
+from django.templatetags.static import static
+
+from blog.constants import IMAGE_DISPLAY_SIZES, IMAGE_RENDITIONS
+from blog.images import RENDITION_FORMATS
+
+register = template.Library()
+
+
+def get_srcset(post, renditions, key):
+    candidates = {}
+    for rendition in renditions:
+        if rendition.get(key):
+            candidates.setdefault(rendition[key], rendition['width'])
+    return ', '.join(
+        f'{post.image.storage.url(name)} {width}w'
+        for name, width in candidates.items()
+    )
+
+
+@register.inclusion_tag('includes/picture.html')
+def post_picture(post, size, css_class=''):
+    """Выводит фото публикации не крупнее заданной копии."""
+    context = {
+        'css_class': css_class,
+        'alt': post.title,
+        'src': post.image.url,
+    }
+    sizes = post.get_renditions()
+    if sizes is None:
+        context.update(
+            src=static('img/image-processing.svg'),
+            alt='Фото обрабатывается',
+        )
+        return context
+    if size not in sizes:
+        return context
+    names = [name for name, _ in IMAGE_RENDITIONS]
+    renditions = [
+        sizes[name] for name in names[:names.index(size) + 1]
+        if name in sizes
+    ]
+    context.update(
+        src=post.image.storage.url(sizes[size]['jpeg']),
+        width=sizes[size]['width'],
+        height=sizes[size]['height'],
+        sizes=IMAGE_DISPLAY_SIZES,
+        **{
+            f'{key}_srcset': get_srcset(post, renditions, key)
+            for key, *_ in RENDITION_FORMATS
+        },
+    )
+    return context
+
+
+@register.simple_tag
+def post_image_url(post, size):
+    return post.get_image_url(size)
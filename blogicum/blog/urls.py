@@ -8,6 +8,9 @@ urlpatterns = [
     path('',
          views.PostListView.as_view(),
          name='index'),
+    path('search/',
+         views.PostSearchView.as_view(),
+         name='search'),
     path('posts/<int:post_id>/',
          views.PostDetailView.as_view(),
          name='post_detail'),
@@ -1,40 +1,85 @@
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy
+from django.utils.http import urlencode
 from django.views.generic import (
     CreateView, DeleteView, ListView, UpdateView
 )
 
-from .constants import COMMENTS_ON_LIST, POSTS_ON_LIST
+from .caching import author_scope, category_scope
+from .constants import COMMENTS_ON_LIST, LOOKUP_CACHE_TIMEOUT, POSTS_ON_LIST
 from .forms import CommentForm, PostForm, ProfileForm
-from .mixins import CommentMixin, OnlyAuthorMixin, PostMixin
+from .mixins import (
+    AnonymousPageCacheMixin, CachedCountMixin, CommentMixin,
+    ConditionalGetMixin, KeysetPaginationMixin, MemoizedLookupMixin,
+    OnlyAuthorMixin, PostMixin
+)
 from .models import Category, Comment, Post, User
 
 
-class PostListView(ListView):
+class PostListView(
+    AnonymousPageCacheMixin, ConditionalGetMixin, CachedCountMixin,
+    KeysetPaginationMixin, ListView
+):
     model = Post
-    queryset = Post.objects.get_posts_comment_count().filter_posts()
+    queryset = Post.objects.get_post_cards().filter_posts()
     paginate_by = POSTS_ON_LIST
     template_name = 'blog/index.html'
 
 
-class PostDetailView(ListView):
+class PostSearchView(
+    AnonymousPageCacheMixin, ConditionalGetMixin, ListView
+):
+    model = Post
+    paginate_by = POSTS_ON_LIST
+    template_name = 'blog/search.html'
+    page_cache_params = ('page', 'q')
+
+    def get_search_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        return Post.objects.get_post_cards().filter_posts().search(
+            self.get_search_query()
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.get_search_query()
+        context['query'] = query
+        if query:
+            context['page_query'] = urlencode({'q': query}) + '&'
+        return context
+
+
+class PostDetailView(ConditionalGetMixin, MemoizedLookupMixin, ListView):
     model = Comment
     template_name = 'blog/detail.html'
     paginate_by = COMMENTS_ON_LIST
+    send_last_modified = True
+
+    def get_cache_scopes(self):
+        return ()
+
+    def get_page_state(self):
+        post = self.get_object()
+        return {
+            'updated_at': post.updated_at,
+            'category_updated_at': post.category and post.category.updated_at,
+            'location_updated_at': post.location and post.location.updated_at,
+            'comment_count': post.comment_count,
+            'author': post.author.username,
+        }
 
     def get_object(self):
-        post = get_object_or_404(
-            Post.objects.get_posts_comment_count(),
+        return self.get_memoized_object(
+            Post.objects.get_posts_comment_count().visible_to(
+                self.request.user
+            ),
             pk=self.kwargs['post_id']
         )
-        if post.author != self.request.user:
-            post = get_object_or_404(
-                Post.objects.get_posts_comment_count().filter_posts(),
-                pk=self.kwargs['post_id']
-            )
-        return post
 
     def get_queryset(self):
         return self.get_object().comments.select_related('author')
@@ -72,6 +117,7 @@ class PostDeleteView(PostMixin, DeleteView):
 class CommentCreateView(CommentMixin, CreateView):
     template_name = 'blog/detail.html'
 
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.author = self.request.user
         form.instance.post = get_object_or_404(Post, pk=self.kwargs['post_id'])
@@ -86,22 +132,28 @@ class CommentDeleteVeiw(CommentMixin, OnlyAuthorMixin, DeleteView):
     pass
 
 
-class CategoryPostsListView(ListView):
+class CategoryPostsListView(
+    AnonymousPageCacheMixin, ConditionalGetMixin, CachedCountMixin,
+    KeysetPaginationMixin, MemoizedLookupMixin, ListView
+):
     model = Post
     category = None
     paginate_by = POSTS_ON_LIST
     template_name = 'blog/category.html'
+    lookup_cache_timeout = LOOKUP_CACHE_TIMEOUT
+
+    def get_cache_scopes(self):
+        return (category_scope(self.kwargs['category_slug']),)
 
     def get_category(self):
-        return get_object_or_404(
-            Category,
+        return self.get_memoized_object(
+            Category.objects,
             slug=self.kwargs['category_slug'],
             is_published=True
         )
 
     def get_queryset(self):
-        return self.get_category().posts.get_posts_comment_count(
-        ).filter_posts()
+        return self.get_category().posts.get_post_cards().filter_posts()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -109,20 +161,32 @@ class CategoryPostsListView(ListView):
         return context
 
 
-class UserPostsListView(ListView):
+class UserPostsListView(
+    AnonymousPageCacheMixin, ConditionalGetMixin, CachedCountMixin,
+    KeysetPaginationMixin, MemoizedLookupMixin, ListView
+):
     model = Post
     paginate_by = POSTS_ON_LIST
     template_name = 'blog/profile.html'
+    lookup_cache_timeout = LOOKUP_CACHE_TIMEOUT
+
+    def get_cache_scopes(self):
+        return (author_scope(self.kwargs['username']),)
+
+    def get_visibility(self):
+        if self.kwargs['username'] == self.request.user.get_username():
+            return 'own'
+        return super().get_visibility()
 
     def get_profile(self):
-        return get_object_or_404(
-            User,
+        return self.get_memoized_object(
+            User.objects,
             username=self.kwargs['username'],
         )
 
     def get_queryset(self):
         profile = self.get_profile()
-        posts = profile.posts.get_posts_comment_count()
+        posts = profile.posts.get_post_cards()
         if profile == self.request.user:
             return posts
         return posts.filter_posts()
@@ -1,15 +1,16 @@
 import os
+import tempfile
 from pathlib import Path
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
-BASE_DIR = Path(__file__).resolve().parent.parent
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 SECRET_KEY = os.getenv('SECRET_KEY', 'django-insecure-SECRET_KEY')
 
-DEBUG = True
+DEBUG = False
 
 ALLOWED_HOSTS = ['127.0.0.1']
 
@@ -24,10 +25,11 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django_bootstrap5',
-    'debug_toolbar',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.NPlusOneMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -35,13 +37,30 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
 
+METRICS_ALLOWED_IPS = [
+    ip for ip in os.getenv('METRICS_ALLOWED_IPS', '').split(',') if ip
+]
+
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+METRICS_DIR = Path(
+    os.getenv('METRICS_DIR', Path(tempfile.gettempdir()) / 'blogicum-metrics')
+)
+
+METRICS_FLUSH_INTERVAL = 5
+
+NPLUSONE_MODE = os.getenv('NPLUSONE_MODE', 'log')
+
+NPLUSONE_SAMPLE_RATE = float(os.getenv('NPLUSONE_SAMPLE_RATE', 0.01))
+
+NPLUSONE_THRESHOLD = 3
+
 ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -66,11 +85,39 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
     }
 }
 
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'wal'),
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -20000,
+    'temp_store': 'memory',
+    'busy_timeout': 5000,
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'blogicum'),
+    },
+    'local': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blogicum-local',
+    },
+}
+
+CACHE_LOCK_DIR = Path(
+    os.getenv('CACHE_LOCK_DIR', Path(tempfile.gettempdir()) / 'blogicum-locks')
+)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -98,6 +145,8 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+STATIC_ROOT = BASE_DIR / 'static'
+
 STATICFILES_DIRS = [
     BASE_DIR / 'static_dev',
 ]
@@ -115,3 +164,11 @@ MEDIA_ROOT = BASE_DIR / 'media'
 LOGIN_REDIRECT_URL = 'blog:index'
 
 LOGIN_URL = 'login'
+
+SESSION_ENGINE = os.getenv(
+    'SESSION_ENGINE', 'django.contrib.sessions.backends.db'
+)
+
+SESSION_LOCAL_CACHE_ALIAS = 'local'
+
+SESSION_LOCAL_CACHE_TIMEOUT = 5
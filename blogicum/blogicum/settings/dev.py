@@ -0,0 +1,16 @@
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import INSTALLED_APPS, MIDDLEWARE
+
+DEBUG = True
+
+INSTALLED_APPS = [*INSTALLED_APPS, 'debug_toolbar']
+
+MIDDLEWARE = [*MIDDLEWARE, 'debug_toolbar.middleware.DebugToolbarMiddleware']
+
+NPLUSONE_SAMPLE_RATE = float(os.getenv('NPLUSONE_SAMPLE_RATE', 1))
+
+METRICS_ALLOWED_IPS = [
+    ip for ip in os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1').split(',') if ip
+]
@@ -1,9 +1,11 @@
+from django.apps import apps
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
 from blog.views import UserCreateView
+from core.views import metrics
 
 urlpatterns = [
     path('admin/',
@@ -17,9 +19,12 @@ urlpatterns = [
          include('blog.urls', namespace='blog')),
     path('pages/',
          include('pages.urls', namespace='pages')),
+    path('metrics/',
+         metrics,
+         name='metrics'),
 ]
 
-if settings.DEBUG:
+if apps.is_installed('debug_toolbar'):
     import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
 
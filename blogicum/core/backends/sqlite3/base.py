@@ -0,0 +1,20 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite с настраиваемым режимом начала транзакций.
+
+    OPTIONS['transaction_mode'] = 'IMMEDIATE' заставляет atomic-блоки сразу
+    брать блокировку записи: в режиме WAL отложенная транзакция, которая
+    читает и затем пишет, иначе падает с «database is locked», не дожидаясь
+    busy_timeout.
+    """
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        kwargs.pop('transaction_mode', None)
+        return kwargs
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+        self.cursor().execute(f'BEGIN {mode}' if mode else 'BEGIN')
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Настраивает каждое новое подключение к SQLite по SQLITE_PRAGMAS."""
+    if connection.vendor != 'sqlite':
+        return
+    cursor = connection.connection.cursor()
+    try:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+    finally:
+        cursor.close()
@@ -0,0 +1,51 @@
+import os
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+SUPPORTED = fcntl is not None
+
+
+def lock_file(path, blocking=True):
+    """Исключительная блокировка flock на файле path.
+
+    Возвращает дескриптор файла или None, если при blocking=False файл
+    уже заблокирован. Блокировку снимает закрытие дескриптора, в том
+    числе при завершении процесса, поэтому упавший процесс не оставляет
+    её навсегда.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def try_lock_path(path):
+    """Неблокирующий flock на path, который освобождают через unlock_path.
+
+    Освобождающий удаляет файл, поэтому блокировка, взятая на уже
+    удалённом файле, не считается: её снимают и пробуют снова.
+    """
+    while True:
+        fd = lock_file(path, blocking=False)
+        if fd is None:
+            return None
+        try:
+            if os.stat(path).st_ino == os.fstat(fd).st_ino:
+                return fd
+        except FileNotFoundError:
+            pass
+        os.close(fd)
+
+
+def unlock_path(path, fd):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    os.close(fd)
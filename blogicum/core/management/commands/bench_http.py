@@ -0,0 +1,430 @@
+import json
+import math
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import (
+    HTTPRedirectHandler, Request, build_opener, urlopen
+)
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+
+from blog.models import Category, Comment, Post, User
+
+DEFAULT_MIX = (
+    'index=30,post_detail=25,category_posts=10,profile=10,search=5,'
+    'about=2,rules=2,add_comment=4,edit_post=3,delete_post=3,'
+    'edit_comment=3,delete_comment=3'
+)
+# Адрес вне INTERNAL_IPS, чтобы debug toolbar не искажал замеры.
+REMOTE_ADDR = '10.0.0.1'
+SERVER_START_TIMEOUT = 30
+
+
+def percentile(values, share):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(math.ceil(share / 100 * len(ordered)) - 1, 0)]
+
+
+def get_host():
+    for host in settings.ALLOWED_HOSTS:
+        if host != '*':
+            return host.lstrip('.')
+    return 'testserver'
+
+
+def parse_mix(value):
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name.strip() not in SCENARIOS:
+            raise CommandError(f'Неизвестный сценарий: {name}')
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+class Targets:
+    """Объекты, на которые направляются запросы сценариев."""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.actor = User.objects.annotate(
+            total=Count('posts')
+        ).order_by('-total').first()
+        if self.actor is None:
+            raise CommandError('Для замера нужны пользователи и публикации.')
+        self.posts = list(
+            Post.objects.filter_posts().values_list('pk', flat=True)[:1000]
+        )
+        self.own_posts = list(
+            self.actor.posts.values_list('pk', flat=True)[:1000]
+        )
+        self.own_comments = list(
+            Comment.objects.filter(author=self.actor)
+            .values_list('post_id', 'pk')[:1000]
+        )
+        self.categories = list(
+            Category.objects.filter(is_published=True)
+            .values_list('slug', flat=True)[:100]
+        )
+        self.usernames = list(
+            User.objects.values_list('username', flat=True)[:1000]
+        )
+        self.terms = ['блог', 'горы', 'море', 'поход', 'город']
+
+    def pick(self, values):
+        if not values:
+            raise LookupError
+        return self.rng.choice(values)
+
+
+SCENARIOS = {
+    'index': (False, lambda t: ('GET', reverse('blog:index'))),
+    'post_detail': (False, lambda t: ('GET', reverse(
+        'blog:post_detail', args=(t.pick(t.posts),)
+    ))),
+    'category_posts': (False, lambda t: ('GET', reverse(
+        'blog:category_posts', args=(t.pick(t.categories),)
+    ))),
+    'profile': (False, lambda t: ('GET', reverse(
+        'blog:profile', args=(t.pick(t.usernames),)
+    ))),
+    'search': (False, lambda t: (
+        'GET', reverse('blog:search') + '?' + urlencode(
+            {'q': t.pick(t.terms)}
+        )
+    )),
+    'about': (False, lambda t: ('GET', reverse('pages:about'))),
+    'rules': (False, lambda t: ('GET', reverse('pages:rules'))),
+    'add_comment': (True, lambda t: ('POST', reverse(
+        'blog:add_comment', args=(t.pick(t.posts),)
+    ))),
+    'edit_post': (True, lambda t: ('GET', reverse(
+        'blog:edit_post', args=(t.pick(t.own_posts),)
+    ))),
+    'delete_post': (True, lambda t: ('GET', reverse(
+        'blog:delete_post', args=(t.pick(t.own_posts),)
+    ))),
+    'edit_comment': (True, lambda t: ('GET', reverse(
+        'blog:edit_comment', args=t.pick(t.own_comments)
+    ))),
+    'delete_comment': (True, lambda t: ('GET', reverse(
+        'blog:delete_comment', args=t.pick(t.own_comments)
+    ))),
+}
+
+
+class InProcessTransport:
+    """Запросы к WSGI-приложению через тестовый клиент Django."""
+
+    def __init__(self, actor):
+        self.clients = {
+            False: Client(REMOTE_ADDR=REMOTE_ADDR, HTTP_HOST=get_host()),
+            True: Client(REMOTE_ADDR=REMOTE_ADDR, HTTP_HOST=get_host()),
+        }
+        self.clients[True].force_login(actor)
+
+    def request(self, method, path, authenticated):
+        client = self.clients[authenticated]
+        data = {'text': 'Комментарий для замера'} if method == 'POST' else {}
+        with CaptureQueriesContext(connection) as captured:
+            response = getattr(client, method.lower())(path, data)
+        return response.status_code, len(captured.captured_queries)
+
+
+class NoRedirectHandler(HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class ServerTransport:
+    """Запросы к запущенному серверу по HTTP, без перехода по редиректам."""
+
+    opener = build_opener(NoRedirectHandler)
+
+    def __init__(self, base_url, actor):
+        self.base_url = base_url.rstrip('/')
+        client = Client()
+        client.force_login(actor)
+        self.csrf_token = get_random_string(32)
+        self.cookies = {
+            False: '',
+            True: (
+                f'{settings.SESSION_COOKIE_NAME}='
+                f'{client.cookies[settings.SESSION_COOKIE_NAME].value}; '
+                f'{settings.CSRF_COOKIE_NAME}={self.csrf_token}'
+            ),
+        }
+
+    def request(self, method, path, authenticated):
+        data = None
+        if method == 'POST':
+            data = urlencode({
+                'text': 'Комментарий для замера',
+                'csrfmiddlewaretoken': self.csrf_token,
+            }).encode()
+        request = Request(self.base_url + path, data=data, method=method)
+        if self.cookies[authenticated]:
+            request.add_header('Cookie', self.cookies[authenticated])
+        try:
+            with self.opener.open(request) as response:
+                response.read()
+                return response.status, None
+        except HTTPError as error:
+            return error.code, None
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный замер страниц blog и pages: задержки p50/p95/p99, '
+        'запросы к БД на страницу и пропускная способность. Сценарий '
+        'add_comment создаёт комментарии — запускайте на тестовой базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--mix',
+            default=DEFAULT_MIX,
+            help='Доли сценариев: имя=вес через запятую. '
+                 f'Сценарии: {", ".join(SCENARIOS)}.',
+        )
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=20,
+            help='Запросы до начала замера, не попадающие в результат.',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Количество параллельных клиентов при замере сервера.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        target = parser.add_mutually_exclusive_group()
+        target.add_argument(
+            '--url',
+            help='Адрес уже запущенного сервера вместо замера в процессе.',
+        )
+        target.add_argument(
+            '--spawn',
+            action='store_true',
+            help='Запустить runserver на свободном порту и замерить его.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Сохранить результат в JSON-файл.',
+        )
+        parser.add_argument(
+            '--compare',
+            help='JSON-файл прошлого замера для сравнения.',
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        mix = parse_mix(options['mix'])
+        targets = Targets(rng)
+        server = None
+        try:
+            if options['spawn']:
+                server, options['url'] = self.spawn_server()
+            if options['url']:
+                transport = ServerTransport(options['url'], targets.actor)
+                mode = 'server'
+            else:
+                if options['concurrency'] > 1:
+                    raise CommandError(
+                        'Замер в процессе выполняется в один поток.'
+                    )
+                transport = InProcessTransport(targets.actor)
+                mode = 'in-process'
+            plan = self.make_plan(rng, mix, targets, options)
+            warmup, plan = (
+                plan[:options['warmup']], plan[options['warmup']:]
+            )
+            self.run(transport, warmup, 1)
+            samples, elapsed = self.run(
+                transport, plan, options['concurrency']
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+        report = self.make_report(samples, elapsed, mode, options)
+        self.print_report(report)
+        if options['compare']:
+            self.print_comparison(
+                json.loads(Path(options['compare']).read_text()), report
+            )
+        if options['output']:
+            Path(options['output']).write_text(
+                json.dumps(report, ensure_ascii=False, indent=2)
+            )
+
+    def make_plan(self, rng, mix, targets, options):
+        names, weights = zip(*mix.items())
+        plan = []
+        for name in rng.choices(
+            names, weights, k=options['requests'] + options['warmup']
+        ):
+            authenticated, build = SCENARIOS[name]
+            try:
+                method, path = build(targets)
+            except LookupError:
+                continue
+            plan.append((name, method, path, authenticated))
+        if not plan:
+            raise CommandError('Нет данных ни для одного сценария.')
+        return plan
+
+    def run(self, transport, plan, concurrency):
+        samples = []
+        lock = threading.Lock()
+        queue = iter(plan)
+
+        def worker():
+            while True:
+                with lock:
+                    item = next(queue, None)
+                if item is None:
+                    return
+                name, method, path, authenticated = item
+                started = time.perf_counter()
+                status, queries = transport.request(
+                    method, path, authenticated
+                )
+                duration = time.perf_counter() - started
+                with lock:
+                    samples.append((name, status, duration, queries))
+
+        started = time.perf_counter()
+        if concurrency == 1:
+            worker()
+        else:
+            threads = [
+                threading.Thread(target=worker) for _ in range(concurrency)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return samples, time.perf_counter() - started
+
+    def make_report(self, samples, elapsed, mode, options):
+        grouped = defaultdict(list)
+        for sample in samples:
+            grouped[sample[0]].append(sample)
+            grouped['total'].append(sample)
+        scenarios = {}
+        for name, items in grouped.items():
+            durations = [duration * 1000 for _, _, duration, _ in items]
+            queries = [count for *_, count in items if count is not None]
+            scenarios[name] = {
+                'requests': len(items),
+                'errors': sum(status >= 400 for _, status, _, _ in items),
+                'p50_ms': percentile(durations, 50),
+                'p95_ms': percentile(durations, 95),
+                'p99_ms': percentile(durations, 99),
+                'mean_ms': sum(durations) / len(durations),
+                'queries_per_request': (
+                    sum(queries) / len(queries) if queries else None
+                ),
+                'requests_per_second': len(items) / elapsed,
+            }
+        return {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'commit': self.get_commit(),
+            'mode': mode,
+            'options': {
+                key: options[key]
+                for key in ('mix', 'requests', 'concurrency', 'seed', 'url')
+            },
+            'elapsed_s': elapsed,
+            'scenarios': scenarios,
+        }
+
+    def print_report(self, report):
+        self.stdout.write(
+            f'{"сценарий":<16}{"запросов":>9}{"ошибок":>8}{"p50":>9}'
+            f'{"p95":>9}{"p99":>9}{"SQL":>7}{"RPS":>9}'
+        )
+        for name, stats in sorted(report['scenarios'].items()):
+            queries = stats['queries_per_request']
+            self.stdout.write(
+                f'{name:<16}{stats["requests"]:>9}{stats["errors"]:>8}'
+                f'{stats["p50_ms"]:>9.1f}{stats["p95_ms"]:>9.1f}'
+                f'{stats["p99_ms"]:>9.1f}'
+                f'{"-" if queries is None else f"{queries:.1f}":>7}'
+                f'{stats["requests_per_second"]:>9.1f}'
+            )
+
+    def print_comparison(self, baseline, report):
+        self.stdout.write(f'Сравнение с {baseline.get("commit") or "-"}:')
+        for name, stats in sorted(report['scenarios'].items()):
+            previous = baseline['scenarios'].get(name)
+            if previous is None:
+                continue
+            changes = []
+            for key in ('p50_ms', 'p95_ms', 'requests_per_second'):
+                if previous[key]:
+                    change = (stats[key] - previous[key]) / previous[key]
+                    changes.append(
+                        f'{key} {previous[key]:.1f} → {stats[key]:.1f} '
+                        f'({change:+.0%})'
+                    )
+            self.stdout.write(f'{name}: {", ".join(changes)}')
+
+    def get_commit(self):
+        try:
+            return subprocess.run(
+                ('git', 'rev-parse', '--short', 'HEAD'),
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def spawn_server(self):
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        server = subprocess.Popen(
+            (
+                sys.executable, str(settings.BASE_DIR / 'manage.py'),
+                'runserver', '--noreload', f'127.0.0.1:{port}',
+            ),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        url = f'http://127.0.0.1:{port}'
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            try:
+                with urlopen(url + reverse('pages:about')):
+                    return server, url
+            except HTTPError:
+                return server, url
+            except URLError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError('Сервер не запустился.')
@@ -0,0 +1,91 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from .bench_http import REMOTE_ADDR, get_host, percentile
+
+ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cached_db_local': 'core.sessions.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_TABLE = '"django_session"'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает механизмы сессий по задержке запросов авторизованного '
+        'пользователя и числу обращений к таблице сессий.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--engines',
+            nargs='+',
+            choices=ENGINES,
+            default=list(ENGINES),
+        )
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument(
+            '--url',
+            default='/pages/about/',
+            help='Страница, которую запрашивает авторизованный пользователь.',
+        )
+        parser.add_argument(
+            '--username',
+            help='Пользователь для замера, по умолчанию первый активный.',
+        )
+
+    def handle(self, *args, engines, requests, warmup, url, username,
+               **options):
+        users = get_user_model().objects.filter(is_active=True)
+        if username:
+            users = users.filter(username=username)
+        user = users.order_by('pk').first()
+        if user is None:
+            raise CommandError('Для замера нужен активный пользователь.')
+        self.stdout.write(
+            f'{"механизм":<18}{"p50, мс":>9}{"p95, мс":>9}'
+            f'{"запросов к сессиям":>20}'
+        )
+        for name in engines:
+            with override_settings(SESSION_ENGINE=ENGINES[name]):
+                durations, session_queries = self.measure(
+                    user, url, requests, warmup
+                )
+            self.stdout.write(
+                f'{name:<18}{percentile(durations, 50):>9.2f}'
+                f'{percentile(durations, 95):>9.2f}'
+                f'{session_queries / requests:>20.2f}'
+            )
+
+    def measure(self, user, url, requests, warmup):
+        client = Client(REMOTE_ADDR=REMOTE_ADDR, HTTP_HOST=get_host())
+        client.force_login(user)
+        durations = []
+        session_queries = 0
+        try:
+            for number in range(warmup + requests):
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    duration = (time.perf_counter() - started) * 1000
+                if response.status_code != 200:
+                    raise CommandError(
+                        f'{url} ответил {response.status_code}.'
+                    )
+                if number >= warmup:
+                    durations.append(duration)
+                    session_queries += sum(
+                        SESSION_TABLE in query['sql']
+                        for query in captured.captured_queries
+                    )
+        finally:
+            client.logout()
+        return durations, session_queries
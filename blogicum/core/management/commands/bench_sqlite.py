@@ -0,0 +1,163 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+from django.test.utils import override_settings
+
+from blog.models import Comment, Post, User
+
+BASELINE_PRAGMAS = {'journal_mode': 'delete', 'synchronous': 'full'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет пропускную способность чтения ленты при параллельной '
+        'записи комментариев на копии базы данных SQLite. baseline '
+        'повторяет настройки по умолчанию: журнал delete, отложенные '
+        'транзакции и новое подключение на каждое чтение.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--readers',
+            type=int,
+            default=4,
+            help='Количество потоков, читающих ленту.',
+        )
+        parser.add_argument(
+            '--writers',
+            type=int,
+            default=2,
+            help='Количество потоков, добавляющих комментарии.',
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=5,
+            help='Длительность каждого замера в секундах.',
+        )
+        parser.add_argument(
+            '--mode',
+            choices=('baseline', 'tuned', 'compare'),
+            default='compare',
+            help='baseline — настройки SQLite по умолчанию, tuned — '
+                 'SQLITE_PRAGMAS, transaction_mode и постоянные подключения.',
+        )
+
+    def handle(self, *args, readers, writers, duration, mode, **options):
+        database = connections.databases['default']
+        if connections['default'].vendor != 'sqlite':
+            raise CommandError('Замер рассчитан только на SQLite.')
+        post_ids = list(
+            Post.objects.filter_posts().values_list('pk', flat=True)[:100]
+        )
+        user_ids = list(User.objects.values_list('pk', flat=True)[:100])
+        if not post_ids or not user_ids:
+            raise CommandError('Для замера нужны публикации и пользователи.')
+        source = str(database['NAME'])
+        self.options = database['OPTIONS']
+        connections.close_all()
+        modes = ('baseline', 'tuned') if mode == 'compare' else (mode,)
+        try:
+            for name in modes:
+                result = self.run(
+                    source, name, readers, writers, duration,
+                    post_ids, user_ids,
+                )
+                self.stdout.write(
+                    f'{name}: чтений {result["reads"] / duration:.1f}/с, '
+                    f'записей {result["writes"] / duration:.1f}/с, '
+                    f'ошибок блокировки {result["errors"]}'
+                )
+        finally:
+            database['NAME'] = source
+            database['OPTIONS'] = self.options
+            connections.close_all()
+
+    def run(self, source, mode, readers, writers, duration, post_ids,
+            user_ids):
+        database = connections.databases['default']
+        options = self.options
+        pragmas = settings.SQLITE_PRAGMAS
+        if mode == 'baseline':
+            pragmas = BASELINE_PRAGMAS
+            options = {**options, 'transaction_mode': None}
+        target = copy_database(source)
+        database.update(NAME=target, OPTIONS=options)
+        self.result = Counter()
+        self.lock = threading.Lock()
+        deadline = time.monotonic() + duration
+        threads = [
+            *(
+                threading.Thread(target=self.read, args=(deadline, mode))
+                for _ in range(readers)
+            ),
+            *(
+                threading.Thread(
+                    target=self.write, args=(deadline, post_ids, user_ids)
+                )
+                for _ in range(writers)
+            ),
+        ]
+        try:
+            with override_settings(SQLITE_PRAGMAS=pragmas):
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+        finally:
+            remove_database(target)
+        return self.result
+
+    def count(self, key):
+        with self.lock:
+            self.result[key] += 1
+
+    def read(self, deadline, mode):
+        while time.monotonic() < deadline:
+            try:
+                list(Post.objects.get_post_cards().filter_posts()[:10])
+                self.count('reads')
+            except OperationalError:
+                self.count('errors')
+            if mode == 'baseline':
+                connections['default'].close()
+        connections.close_all()
+
+    def write(self, deadline, post_ids, user_ids):
+        while time.monotonic() < deadline:
+            try:
+                with transaction.atomic():
+                    post = Post.objects.get(pk=random.choice(post_ids))
+                    Comment.objects.create(
+                        post=post,
+                        author_id=random.choice(user_ids),
+                        text='Комментарий для замера',
+                    )
+                self.count('writes')
+            except OperationalError:
+                self.count('errors')
+        connections.close_all()
+
+
+def copy_database(source):
+    target = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    with sqlite3.connect(source) as original:
+        copy = sqlite3.connect(target)
+        original.backup(copy)
+        copy.close()
+    return target
+
+
+def remove_database(target):
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(target + suffix):
+            os.remove(target + suffix)
+    os.rmdir(os.path.dirname(target))
@@ -0,0 +1,129 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PROFILES = ('dev', 'prod')
+DEFAULT_URLS = ('/', '/pages/about/')
+# Выполняется в отдельном процессе, чтобы замер начинался с пустого
+# интерпретатора и не зависел от уже загруженных модулей.
+CHILD_SCRIPT = '''
+import json
+import sys
+import time
+
+started = time.perf_counter()
+import django
+django.setup()
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+get_wsgi_application()
+get_resolver().url_patterns
+startup = time.perf_counter() - started
+
+from django.conf import settings
+from django.test import Client
+
+urls, count = json.loads(sys.argv[1]), int(sys.argv[2])
+host = next(
+    (host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*'),
+    'testserver',
+)
+client = Client(HTTP_HOST=host, REMOTE_ADDR='10.0.0.1')
+requests = {}
+for url in urls if count else ():
+    timings = []
+    for _ in range(count + 1):
+        request_started = time.perf_counter()
+        status = client.get(url).status_code
+        timings.append(time.perf_counter() - request_started)
+    requests[url] = {'status': status, 'timings': timings}
+print(json.dumps({'startup': startup, 'requests': requests}))
+'''
+
+
+def run_child(profile, urls, count):
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': 'blogicum.settings',
+        'DJANGO_ENV': profile,
+    }
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD_SCRIPT, json.dumps(urls), str(count)],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode:
+        raise CommandError(
+            f'Профиль {profile} не запустился:\n{result.stderr.strip()}'
+        )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает профили настроек: время запуска приложения в новом '
+        'процессе и время ответа на страницы, включая первый запрос, на '
+        'котором компилируются шаблоны. Для prod перед замером нужен '
+        'collectstatic.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles',
+            nargs='+',
+            choices=PROFILES,
+            default=list(PROFILES),
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=5,
+            help='Количество запусков процесса на профиль.',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=50,
+            help='Количество повторных запросов к каждой странице; 0 '
+                 'отключает замер ответов.',
+        )
+        parser.add_argument(
+            '--url',
+            action='append',
+            dest='urls',
+            help=f'Адрес страницы, по умолчанию {", ".join(DEFAULT_URLS)}.',
+        )
+
+    def handle(self, *args, profiles, runs, requests, urls, **options):
+        if runs < 1:
+            raise CommandError('--runs должно быть не меньше 1.')
+        urls = urls or list(DEFAULT_URLS)
+        for profile in profiles:
+            results = [
+                run_child(profile, urls, requests if run == 0 else 0)
+                for run in range(runs)
+            ]
+            startup = statistics.median(
+                result['startup'] for result in results
+            )
+            self.stdout.write(f'{profile}: запуск {startup * 1000:.1f} мс')
+            for url, measured in results[0]['requests'].items():
+                self.report_url(profile, url, measured)
+
+    def report_url(self, profile, url, measured):
+        if measured['status'] != 200:
+            raise CommandError(
+                f'{url} в профиле {profile} ответил {measured["status"]}.'
+            )
+        first, *rest = measured['timings']
+        self.stdout.write(
+            f'  {url}: первый запрос {first * 1000:.1f} мс, далее '
+            f'{statistics.median(rest) * 1000:.2f} мс (медиана)'
+        )
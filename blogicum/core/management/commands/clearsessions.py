@@ -0,0 +1,58 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.timezone import now
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет истёкшие сессии. Для сессий в базе данных удаляет их '
+        'пакетами в отдельных транзакциях, чтобы не блокировать запись '
+        'надолго.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество сессий, удаляемых одним запросом.',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.05,
+            help='Пауза между пакетами в секундах.',
+        )
+
+    def handle(self, *args, batch_size, pause, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not issubclass(store, DBStore):
+            try:
+                store.clear_expired()
+            except NotImplementedError:
+                raise CommandError(
+                    f'Механизм сессий {settings.SESSION_ENGINE} не '
+                    'поддерживает удаление истёкших сессий.'
+                )
+            return
+        sessions = store.get_model_class().objects
+        started = now()
+        deleted = 0
+        while True:
+            with transaction.atomic():
+                keys = list(sessions.filter(
+                    expire_date__lt=started
+                ).values_list('pk', flat=True)[:batch_size])
+                sessions.filter(pk__in=keys).delete()
+            deleted += len(keys)
+            if len(keys) < batch_size:
+                break
+            time.sleep(pause)
+        self.stdout.write(f'Удалено истёкших сессий: {deleted}')
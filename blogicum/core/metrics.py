@@ -0,0 +1,235 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from uuid import uuid4
+
+from django.conf import settings
+
+from . import locks
+
+PREFIX = 'blogicum'
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+RETIRED_SNAPSHOT = 'retired.json'
+COLLECT_LOCK = 'collect.lock'
+
+HISTOGRAMS = {
+    'request_duration_seconds': (
+        'Время обработки запроса целиком.', DURATION_BUCKETS
+    ),
+    'db_queries': ('Количество SQL-запросов на запрос.', QUERY_BUCKETS),
+    'db_duration_seconds': (
+        'Суммарное время SQL-запросов на запрос.', DURATION_BUCKETS
+    ),
+    'template_render_seconds': (
+        'Время отрисовки шаблона ответа.', DURATION_BUCKETS
+    ),
+    'response_size_bytes': ('Размер тела ответа.', SIZE_BUCKETS),
+}
+
+
+def get_metrics_dir():
+    return Path(settings.METRICS_DIR)
+
+
+class Registry:
+    """Гистограммы процесса, периодически сбрасываемые в общий каталог.
+
+    Каждый процесс пишет собственный файл и, пока жив, держит flock на
+    одноимённом .lock; эндпоинт метрик суммирует все файлы.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.lock_fd = None
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        name = f'{self.pid}-{uuid4().hex}'
+        self.snapshot_name = f'{name}.json'
+        self.lock_name = f'{name}.lock'
+        if self.lock_fd is not None:
+            # Дескриптор унаследован от родителя: закрытие в дочернем
+            # процессе не снимает блокировку родителя.
+            os.close(self.lock_fd)
+            self.lock_fd = None
+        self.lock_path = None
+        self.histograms = {}
+        self.flushed_at = 0
+
+    def observe(self, name, labels, value):
+        buckets = HISTOGRAMS[name][1]
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            if self.pid != os.getpid():
+                self.reset()
+            histogram = self.histograms.setdefault(
+                key, {'buckets': [0] * len(buckets), 'sum': 0, 'count': 0}
+            )
+            index = bisect_left(buckets, value)
+            if index < len(buckets):
+                histogram['buckets'][index] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return [
+                {
+                    'name': name,
+                    'labels': dict(labels),
+                    'buckets': list(histogram['buckets']),
+                    'sum': histogram['sum'],
+                    'count': histogram['count'],
+                }
+                for (name, labels), histogram in self.histograms.items()
+            ]
+
+    def flush(self, force=False):
+        # Под блокировкой, чтобы потоки не писали снимок одновременно и
+        # более старый снимок не заменял более новый.
+        with self.lock:
+            now = time.monotonic()
+            interval = settings.METRICS_FLUSH_INTERVAL
+            if not force and now - self.flushed_at < interval:
+                return
+            self.flushed_at = now
+            directory = get_metrics_dir()
+            directory.mkdir(parents=True, exist_ok=True)
+            lock_path = directory / self.lock_name
+            if locks.SUPPORTED and self.lock_path != lock_path:
+                if self.lock_fd is not None:
+                    os.close(self.lock_fd)
+                self.lock_fd = locks.lock_file(lock_path)
+                self.lock_path = lock_path
+            write_snapshot(directory / self.snapshot_name, self.snapshot())
+
+
+registry = Registry()
+
+
+def write_snapshot(path, entries):
+    temporary = path.with_name(
+        f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp'
+    )
+    temporary.write_text(json.dumps(entries))
+    os.replace(temporary, path)
+
+
+def read_snapshot(path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def merge(merged, entries):
+    for entry in entries:
+        if entry['name'] not in HISTOGRAMS:
+            continue
+        key = (entry['name'], tuple(sorted(entry['labels'].items())))
+        total = merged.setdefault(key, {
+            'buckets': [0] * len(entry['buckets']), 'sum': 0, 'count': 0
+        })
+        total['buckets'] = [
+            a + b for a, b in zip(total['buckets'], entry['buckets'])
+        ]
+        total['sum'] += entry['sum']
+        total['count'] += entry['count']
+    return merged
+
+
+def retire_dead_snapshots(directory):
+    """Переносит снимки завершившихся процессов в один общий файл.
+
+    Иначе при перезапусках рабочих процессов каталог растёт без
+    ограничений, а каждый запрос /metrics/ читает все файлы.
+    """
+    retired_path = directory / RETIRED_SNAPSHOT
+    retired = merge({}, read_snapshot(retired_path) or [])
+    dead = []
+    for path in directory.glob('*.json'):
+        if path.name == RETIRED_SNAPSHOT:
+            continue
+        # Блокировку живого процесса взять не получится.
+        fd = locks.lock_file(path.with_suffix('.lock'), blocking=False)
+        if fd is None:
+            continue
+        dead.append((path, fd))
+        merge(retired, read_snapshot(path) or [])
+    if dead:
+        write_snapshot(retired_path, [
+            {'name': name, 'labels': dict(labels), **histogram}
+            for (name, labels), histogram in retired.items()
+        ])
+    for path, fd in dead:
+        path.unlink(missing_ok=True)
+        path.with_suffix('.lock').unlink(missing_ok=True)
+        os.close(fd)
+
+
+def collect():
+    """Суммирует снимки всех процессов, включая текущий."""
+    registry.flush(force=True)
+    directory = get_metrics_dir()
+    collect_fd = None
+    if locks.SUPPORTED:
+        collect_fd = locks.lock_file(directory / COLLECT_LOCK)
+    try:
+        if collect_fd is not None:
+            retire_dead_snapshots(directory)
+        merged = {}
+        for path in directory.glob('*.json'):
+            merge(merged, read_snapshot(path) or [])
+        return merged
+    finally:
+        if collect_fd is not None:
+            os.close(collect_fd)
+
+
+def escape(value):
+    return (
+        str(value).replace('\\', r'\\').replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
+
+
+def format_labels(labels):
+    return ','.join(f'{key}="{escape(value)}"' for key, value in labels)
+
+
+def render_prometheus(merged):
+    lines = []
+    for name, (description, buckets) in HISTOGRAMS.items():
+        metric = f'{PREFIX}_{name}'
+        lines.append(f'# HELP {metric} {description}')
+        lines.append(f'# TYPE {metric} histogram')
+        for (entry_name, labels), histogram in sorted(merged.items()):
+            if entry_name != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets, histogram['buckets']):
+                cumulative += count
+                bucket_labels = format_labels((*labels, ('le', bound)))
+                lines.append(
+                    f'{metric}_bucket{{{bucket_labels}}} {cumulative}'
+                )
+            inf_labels = format_labels((*labels, ('le', '+Inf')))
+            lines.append(
+                f'{metric}_bucket{{{inf_labels}}} {histogram["count"]}'
+            )
+            lines.append(
+                f'{metric}_sum{{{format_labels(labels)}}} {histogram["sum"]}'
+            )
+            lines.append(
+                f'{metric}_count{{{format_labels(labels)}}} '
+                f'{histogram["count"]}'
+            )
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,91 @@
+import random
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import registry
+from .nplusone import NPlusOneDetector, NPlusOneError, logger
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += perf_counter() - started
+
+
+class MetricsMiddleware:
+    """Собирает время ответа, SQL, отрисовку шаблона и размер по видам."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryStats()
+        started = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+        duration = perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        registry.observe('request_duration_seconds', {
+            'view': view,
+            'method': request.method,
+            'status': f'{response.status_code // 100}xx',
+        }, duration)
+        labels = {'view': view}
+        registry.observe('db_queries', labels, queries.count)
+        registry.observe('db_duration_seconds', labels, queries.duration)
+        render_time = getattr(request, '_metrics_render_time', None)
+        if render_time is not None:
+            registry.observe('template_render_seconds', labels, render_time)
+        if not response.streaming:
+            registry.observe(
+                'response_size_bytes', labels, len(response.content)
+            )
+        registry.flush()
+        return response
+
+    def process_template_response(self, request, response):
+        started = perf_counter()
+
+        def record_render_time(response):
+            request._metrics_render_time = perf_counter() - started
+
+        response.add_post_render_callback(record_render_time)
+        return response
+
+
+class NPlusOneMiddleware:
+    """Ищет N+1 запросы в части запросов (NPLUSONE_SAMPLE_RATE).
+
+    В режиме log пишет отчёт в журнал, в режиме raise — выбрасывает
+    NPlusOneError, что удобно в разработке и тестах.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = settings.NPLUSONE_MODE
+        if mode == 'off' or random.random() >= settings.NPLUSONE_SAMPLE_RATE:
+            return self.get_response(request)
+        with NPlusOneDetector() as detector:
+            response = self.get_response(request)
+        if detector.problems:
+            report = detector.report(request.get_full_path())
+            if mode == 'raise':
+                raise NPlusOneError(report)
+            logger.warning(report)
+        return response
@@ -18,3 +18,10 @@ class IsPublishedCreatedAtModel(CreatedAtModel):
 
     class Meta(CreatedAtModel.Meta):
         abstract = True
+
+
+class UpdatedAtModel(models.Model):
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+
+    class Meta:
+        abstract = True
@@ -0,0 +1,105 @@
+import logging
+import re
+import sys
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.db import connections
+from django.template.base import Node
+
+logger = logging.getLogger(__name__)
+
+DJANGO_DIR = str(Path(django.__file__).parent)
+THIS_FILE = __file__
+IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+SPACE_RE = re.compile(r'\s+')
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+def normalize_sql(sql):
+    """Приводит запрос к форме без значений, чтобы сравнивать повторы."""
+    sql = IN_LIST_RE.sub('IN (...)', sql)
+    sql = LITERAL_RE.sub('?', sql)
+    return SPACE_RE.sub(' ', sql).strip()
+
+
+def is_library_frame(filename):
+    return (
+        filename.startswith(DJANGO_DIR)
+        or filename == THIS_FILE
+        or 'site-packages' in filename
+        or filename.startswith('<')
+    )
+
+
+def get_call_site():
+    """Место в шаблоне и коде проекта, откуда выполнен запрос."""
+    template_site = code_site = None
+    frame = sys._getframe(2)
+    while frame is not None and not (template_site and code_site):
+        code = frame.f_code
+        node = frame.f_locals.get('self')
+        if (
+            template_site is None
+            and code.co_name == 'render_annotated'
+            and isinstance(node, Node)
+            and node.token is not None
+        ):
+            origin = node.origin
+            template_site = (
+                f'{origin.template_name or origin.name}:{node.token.lineno}'
+            )
+        elif code_site is None and not is_library_frame(code.co_filename):
+            code_site = (
+                f'{Path(code.co_filename).name}:{frame.f_lineno} '
+                f'in {code.co_name}'
+            )
+        frame = frame.f_back
+    return ' ← '.join(site for site in (template_site, code_site) if site)
+
+
+class NPlusOneDetector:
+    """Группирует SELECT-запросы по форме и месту вызова.
+
+    Если один и тот же запрос из одного места выполняется threshold раз
+    и более, это ленивая подгрузка связанных объектов в цикле.
+    """
+
+    def __init__(self, threshold=None):
+        self.threshold = threshold or settings.NPLUSONE_THRESHOLD
+        self.queries = Counter()
+        self.stack = ExitStack()
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith('SELECT'):
+            self.queries[normalize_sql(sql), get_call_site()] += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        for connection in connections.all():
+            self.stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stack.close()
+
+    @property
+    def problems(self):
+        return [
+            (shape, site, count)
+            for (shape, site), count in self.queries.most_common()
+            if count >= self.threshold
+        ]
+
+    def report(self, label=''):
+        lines = [f'Повторяющиеся запросы (N+1) {label}'.strip()]
+        for shape, site, count in self.problems:
+            lines.append(f'{count}× {site or "?"}: {shape}')
+        return '\n'.join(lines)
@@ -0,0 +1,43 @@
+from contextlib import contextmanager
+
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--nplusone',
+        action='store_true',
+        help='Падать, если ответ тестового клиента выполнил N+1 запросов.',
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers', 'nplusone: проверять ответы теста на N+1 запросы.'
+    )
+
+
+@pytest.fixture(autouse=True)
+def detect_nplusone(request):
+    if not (
+        request.config.getoption('nplusone')
+        or request.node.get_closest_marker('nplusone')
+    ):
+        yield
+        return
+    from django.test import override_settings
+    with override_settings(NPLUSONE_MODE='raise', NPLUSONE_SAMPLE_RATE=1):
+        yield
+
+
+@pytest.fixture
+def assert_no_nplusone():
+    from core.nplusone import NPlusOneDetector
+
+    @contextmanager
+    def check(threshold=None):
+        with NPlusOneDetector(threshold) as detector:
+            yield detector
+        assert not detector.problems, detector.report()
+
+    return check
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.core.cache import caches
+
+
+class SessionStore(cached_db.SessionStore):
+    """cached_db с дополнительным кэшем в памяти процесса.
+
+    Сессия ищется сначала в кэше SESSION_LOCAL_CACHE_ALIAS, затем в общем
+    кэше и в базе. Изменения, сделанные другим процессом, в том числе
+    выход из аккаунта, видны не позже чем через
+    SESSION_LOCAL_CACHE_TIMEOUT секунд.
+    """
+
+    def __init__(self, session_key=None):
+        self._local_cache = caches[settings.SESSION_LOCAL_CACHE_ALIAS]
+        super().__init__(session_key)
+
+    def set_local(self, key, data):
+        self._local_cache.set(
+            key, data, settings.SESSION_LOCAL_CACHE_TIMEOUT
+        )
+
+    def load(self):
+        if self.session_key is None:
+            return super().load()
+        key = self.cache_key
+        data = self._local_cache.get(key)
+        if data is None:
+            data = super().load()
+            if self.session_key is not None:
+                self.set_local(key, data)
+        return data
+
+    def save(self, must_create=False):
+        super().save(must_create)
+        self.set_local(self.cache_key, self._session)
+
+    def delete(self, session_key=None):
+        super().delete(session_key)
+        session_key = session_key or self.session_key
+        if session_key is not None:
+            self._local_cache.delete(self.cache_key_prefix + session_key)
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from .metrics import collect, render_prometheus
+
+
+def has_metrics_access(request):
+    """Доступ к метрикам по токену или по адресу из белого списка.
+
+    За обратным прокси на той же машине REMOTE_ADDR у всех клиентов
+    равен адресу прокси, поэтому в рабочем окружении нужен токен.
+    """
+    token = settings.METRICS_TOKEN
+    if token and constant_time_compare(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'
+    ):
+        return True
+    return request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+
+
+def metrics(request):
+    if not has_metrics_access(request):
+        raise Http404
+    return HttpResponse(
+        render_prometheus(collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -41,6 +41,18 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache(settings, tmp_path):
+    from django.core.cache import caches
+    from blog.caching import held_locks, release_lock
+    for cache in caches.all():
+        cache.clear()
+    settings.CACHE_LOCK_DIR = tmp_path / "locks"
+    yield
+    for key in list(held_locks):
+        release_lock(key)
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -88,6 +100,7 @@ with SafeImportFromContextManager(
                 )
 
 pytest_plugins = [
+    "core.pytest_plugin",
     "fixtures.posts",
     "fixtures.locations",
     "fixtures.categories",
@@ -363,6 +376,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
@@ -0,0 +1,31 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+def test_bench_http_in_process(tmp_path, comment_to_a_post):
+    output = tmp_path / 'bench.json'
+    call_command(
+        'bench_http', requests=60, warmup=5, output=str(output),
+        stdout=StringIO(),
+    )
+    report = json.loads(output.read_text())
+    assert report['mode'] == 'in-process'
+    total = report['scenarios']['total']
+    assert total['requests'] == sum(
+        stats['requests'] for name, stats in report['scenarios'].items()
+        if name != 'total'
+    )
+    assert total['errors'] == 0
+    assert total['p50_ms'] <= total['p95_ms'] <= total['p99_ms']
+    assert report['scenarios']['index']['queries_per_request'] > 0
+
+    stdout = StringIO()
+    call_command(
+        'bench_http', requests=20, warmup=0, compare=str(output),
+        stdout=stdout,
+    )
+    assert 'p95_ms' in stdout.getvalue()
@@ -0,0 +1,49 @@
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_comments(mixer, post_with_published_location):
+    comments = mixer.cycle(3).blend(
+        Comment, post=post_with_published_location
+    )
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.comment_count == 3, (
+        'Убедитесь, что при добавлении комментария увеличивается счётчик'
+        ' комментариев публикации.'
+    )
+
+    comments[0].delete()
+    Comment.objects.filter(pk=comments[1].pk).delete()
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.comment_count == 1, (
+        'Убедитесь, что при удалении комментария уменьшается счётчик'
+        ' комментариев публикации.'
+    )
+
+
+@pytest.mark.django_db
+def test_post_save_keeps_comment_count(mixer, post_with_published_location):
+    stale_post = Post.objects.get(pk=post_with_published_location.pk)
+    mixer.blend(Comment, post=post_with_published_location)
+    stale_post.title = 'Новый заголовок'
+    stale_post.save()
+    stale_post.refresh_from_db()
+    assert stale_post.comment_count == 1, (
+        'Убедитесь, что сохранение публикации не перезаписывает счётчик'
+        ' комментариев.'
+    )
+
+
+@pytest.mark.django_db
+def test_recount_comments(mixer, post_with_published_location):
+    mixer.cycle(2).blend(Comment, post=post_with_published_location)
+    Post.objects.update(comment_count=10)
+    call_command('recount_comments')
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.comment_count == 2, (
+        'Убедитесь, что команда `recount_comments` восстанавливает'
+        ' счётчики комментариев.'
+    )
@@ -0,0 +1,128 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+
+from blog.models import Post
+
+
+def revalidate(client, url, response, **headers):
+    with CaptureQueriesContext(connection) as captured:
+        revalidated = client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'], **headers
+        )
+    return revalidated, captured.captured_queries
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_template', (
+    '/',
+    '/category/{post.category.slug}/',
+    '/profile/{post.author.username}/',
+    '/posts/{post.id}/',
+))
+def test_unchanged_pages_are_not_modified(
+        user_client, post_with_published_location, url_template):
+    post = post_with_published_location
+    url = url_template.format(post=post)
+    user_client.get(url)
+    response = user_client.get(url)
+    assert response.status_code == 200
+    assert response.has_header('ETag'), (
+        'Убедитесь, что страницы отдают заголовок ETag.'
+    )
+    assert response.has_header('Last-Modified') == url.startswith(
+        '/posts/'
+    ), 'Убедитесь, что Last-Modified отдаёт только страница публикации.'
+    assert 'private' in response['Cache-Control']
+
+    revalidated, queries = revalidate(user_client, url, response)
+    assert revalidated.status_code == 304
+    assert revalidated.content == b''
+    post_queries = [
+        query['sql'] for query in queries if 'blog_post' in query['sql']
+    ]
+    assert len(post_queries) == 1, (
+        'Убедитесь, что для ответа 304 выполняется один запрос к публикациям.'
+    )
+    if response.has_header('Last-Modified'):
+        assert user_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        ).status_code == 304
+
+    post.title = 'Изменённый заголовок'
+    post.save()
+    revalidated, _ = revalidate(user_client, url, response)
+    assert revalidated.status_code == 200
+    assert 'Изменённый заголовок' in revalidated.content.decode('utf-8')
+
+
+@pytest.mark.django_db
+def test_validators_depend_on_user_and_comments(
+        user_client, another_user_client, comment_to_a_post):
+    post = comment_to_a_post.post
+    url = f'/posts/{post.id}/'
+    another_user_client.get(url)
+    response = another_user_client.get(url)
+    assert user_client.get(url)['ETag'] != response['ETag']
+
+    comment_to_a_post.text = 'Исправленный комментарий'
+    comment_to_a_post.save()
+    revalidated, _ = revalidate(another_user_client, url, response)
+    assert revalidated.status_code == 200, (
+        'Убедитесь, что изменение комментария меняет валидатор страницы поста.'
+    )
+
+
+@pytest.mark.django_db
+def test_cached_anonymous_page_revalidates_without_queries(
+        client, post_with_published_location):
+    response = client.get('/')
+    revalidated, queries = revalidate(client, '/', response)
+    assert revalidated.status_code == 304
+    assert not queries
+
+
+@pytest.mark.django_db
+def test_keyset_page_is_not_modified(
+        user_client, many_posts_with_published_locations):
+    first = user_client.get('/')
+    url = f'/?cursor={first.context["page_obj"].next_cursor}'
+    response = user_client.get(url)
+    assert response.status_code == 200
+    revalidated, _ = revalidate(user_client, url, response)
+    assert revalidated.status_code == 304
+
+
+@pytest.mark.django_db
+def test_scheduled_post_going_live_is_modified(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.get('/')
+    user_client.get('/')
+    Post.objects.filter(pk=post.pk).update(
+        title='Отложенная публикация',
+        pub_date=timezone.now() + timedelta(days=1),
+        is_visible=False,
+    )
+    hidden_since = Post.objects.get(pk=post.pk).updated_at
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    call_command('publish_scheduled_posts', stdout=StringIO())
+    assert Post.objects.get(pk=post.pk).updated_at > hidden_since, (
+        'Убедитесь, что открытие доступа к публикации обновляет updated_at.'
+    )
+    response = user_client.get(
+        '/', HTTP_IF_MODIFIED_SINCE=http_date(timezone.now().timestamp())
+    )
+    assert response.status_code == 200, (
+        'Убедитесь, что после публикации отложенного поста запрос с '
+        'If-Modified-Since получает страницу целиком.'
+    )
+    assert 'Отложенная публикация' in response.content.decode('utf-8')
@@ -0,0 +1,118 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.models import ImageJob, Post
+
+
+def make_image_file(size, name='large_image.jpg'):
+    img = Image.new('RGB', size, color=(73, 109, 137))
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    img_io = BytesIO()
+    img.save(img_io, format='JPEG', exif=exif)
+    return ImageFile(img_io, name=name)
+
+
+def process_images():
+    call_command('process_images', workers=1, stdout=StringIO())
+
+
+@pytest.fixture
+def post_with_large_image(
+        mixer, user, published_location, published_category):
+    return mixer.blend(
+        'blog.Post',
+        location=published_location,
+        category=published_category,
+        author=user,
+        image=make_image_file((2000, 1000)),
+    )
+
+
+@pytest.mark.django_db
+def test_renditions_are_generated_by_worker(post_with_large_image):
+    post = post_with_large_image
+    assert ImageJob.objects.filter(post=post, image=post.image.name).exists()
+    assert Post.objects.get(pk=post.pk).get_renditions() is None
+
+    process_images()
+    assert not ImageJob.objects.exists()
+    renditions = Post.objects.get(pk=post.pk).image_renditions
+    assert (renditions['width'], renditions['height']) == (1000, 2000), (
+        'Убедитесь, что фото поворачиваются по EXIF-ориентации.'
+    )
+    expected = {'thumb': (80, 160), 'card': (320, 640), 'detail': (640, 1280)}
+    storage = post.image.storage
+    for size, dimensions in expected.items():
+        rendition = renditions['sizes'][size]
+        assert (rendition['width'], rendition['height']) == dimensions
+        with storage.open(rendition['webp']) as webp:
+            assert Image.open(webp).format == 'WEBP'
+        with storage.open(rendition['jpeg']) as jpeg:
+            picture = Image.open(jpeg)
+            assert picture.size == dimensions
+            assert not picture.getexif()
+
+    old_names = [
+        renditions['sizes']['card'][key] for key in ('jpeg', 'webp')
+    ]
+    post.image = make_image_file((300, 300), name='small_image.jpg')
+    post.save()
+    process_images()
+    assert all(not storage.exists(name) for name in old_names)
+    sizes = Post.objects.get(pk=post.pk).image_renditions['sizes']
+    assert sizes['card'] == sizes['detail']
+
+    post.image = None
+    post.save()
+    process_images()
+    assert Post.objects.get(pk=post.pk).image_renditions == {}
+
+
+@pytest.mark.django_db
+def test_broken_image_is_retried_then_shown_as_is(post_with_large_image):
+    post = post_with_large_image
+    post.image.storage.delete(post.image.name)
+    post.image.storage.save(post.image.name, ContentFile(b'not an image'))
+    call_command(
+        'process_images', workers=1, max_attempts=2,
+        stdout=StringIO(),
+    )
+    job = ImageJob.objects.get(post=post)
+    assert (job.status, job.attempts) == (ImageJob.Status.PENDING, 1)
+
+    ImageJob.objects.update(run_after=job.created_at)
+    call_command(
+        'process_images', workers=1, max_attempts=2,
+        stdout=StringIO(),
+    )
+    job.refresh_from_db()
+    assert (job.status, job.attempts) == (ImageJob.Status.FAILED, 2)
+    post.refresh_from_db()
+    assert post.get_renditions() == {}
+    assert post.get_image_url('card') == post.image.url
+
+
+@pytest.mark.django_db
+def test_feed_shows_placeholder_then_renditions(
+        client, post_with_published_location):
+    post = post_with_published_location
+    content = client.get('/').content.decode('utf-8')
+    assert 'img/image-processing.svg' in content, (
+        'Убедитесь, что до обработки фото в ленте выводится заглушка.'
+    )
+
+    process_images()
+    post.refresh_from_db()
+    card = post.image_renditions['sizes']['card']
+    content = client.get('/').content.decode('utf-8')
+    assert '<source type="image/webp"' in content
+    assert post.image.storage.url(card['jpeg']) in content
+    assert f'src="{post.image.url}"' not in content, (
+        'Убедитесь, что в ленте выводятся уменьшенные копии фото.'
+    )
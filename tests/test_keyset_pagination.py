@@ -0,0 +1,69 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+
+@pytest.fixture
+def posts_with_equal_dates(mixer, user, published_category):
+    pub_date = timezone.now() - timedelta(days=1)
+    return mixer.cycle(N_PER_PAGE * 2 + 3).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=mixer.sequence(
+            *(pub_date - timedelta(hours=i // 2) for i in range(30))
+        ),
+    )
+
+
+def get_page(client, url):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Убедитесь, что страница `{url}` загружается без ошибок.'
+    )
+    return response.context['page_obj']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_template', (
+    '/',
+    '/category/{category.slug}/',
+    '/profile/{user.username}/',
+))
+def test_cursor_pages_cover_all_posts(
+        client, user, published_category, posts_with_equal_dates,
+        url_template):
+    url = url_template.format(category=published_category, user=user)
+    page = get_page(client, url)
+    pages = [list(page)]
+    while page.has_next():
+        page = get_page(client, f'{url}?cursor={page.next_cursor}')
+        pages.append(list(page))
+
+    seen = [post.pk for posts in pages for post in posts]
+    expected = sorted(
+        posts_with_equal_dates, key=lambda post: (post.pub_date, post.pk),
+        reverse=True,
+    )
+    assert seen == [post.pk for post in expected], (
+        'Убедитесь, что переход по курсорам выводит все публикации'
+        ' по порядку, без пропусков и повторов.'
+    )
+    assert [len(posts) for posts in pages] == [N_PER_PAGE, N_PER_PAGE, 3]
+
+    previous = get_page(client, f'{url}?cursor={page.previous_cursor}')
+    assert [post.pk for post in previous] == [post.pk for post in pages[-2]], (
+        'Убедитесь, что курсор предыдущей страницы возвращает на'
+        ' предыдущую страницу.'
+    )
+
+
+@pytest.mark.django_db
+def test_invalid_cursor_returns_404(client):
+    response = client.get('/?cursor=not-a-cursor')
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,81 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils.timezone import now
+
+from blog.management.commands.generate_load_data import (
+    parse_reference_time
+)
+from blog.models import Category, Comment, Post, User
+
+
+REFERENCE_TIME = parse_reference_time('2025-01-01T00:00:00+00:00')
+
+
+def generate(prefix, seed=1, **options):
+    call_command(
+        'generate_load_data', users=5, posts=40, comments=200, categories=4,
+        locations=3, seed=seed, prefix=prefix, batch_size=16,
+        unpublished_share=0.25, stdout=StringIO(), **options,
+    )
+    return list(
+        Post.objects.filter(author__username__startswith=f'{prefix}_')
+        .order_by('pk').values_list(
+            'title', 'comment_count', 'is_published', 'pub_date',
+            'created_at',
+        )
+    ), list(
+        Comment.objects.filter(author__username__startswith=f'{prefix}_')
+        .order_by('pk').values_list('text', 'created_at')
+    )
+
+
+@pytest.mark.django_db
+def test_generate_load_data():
+    first, first_comments = generate('first', now=REFERENCE_TIME)
+    assert User.objects.filter(username__startswith='first_').count() == 5
+    assert Category.objects.filter(slug__startswith='first-').count() == 4
+    assert Category.objects.filter(is_published=False).count() == 1
+    assert len(first) == 40
+    assert Comment.objects.count() == 200
+    assert Post.objects.recount_comments() == 0, (
+        'Убедитесь, что счётчики комментариев совпадают с комментариями.'
+    )
+    assert Post.objects.refresh_visibility() == []
+    assert max(post[1] for post in first) > 200 / 40
+    assert max(post[4] for post in first) <= REFERENCE_TIME, (
+        'Убедитесь, что даты отсчитываются от --now, а не от текущего '
+        'времени.'
+    )
+
+    assert generate('second', now=REFERENCE_TIME) == (
+        first, first_comments
+    ), (
+        'Убедитесь, что одинаковые seed и --now дают одинаковые данные.'
+    )
+
+
+@pytest.mark.django_db
+def test_fixture_posts_are_visible_after_loaddata(settings):
+    call_command(
+        'loaddata', settings.BASE_DIR / 'db.json', verbosity=0
+    )
+    assert Post.objects.filter_posts().exists()
+    assert Post.objects.refresh_visibility() == [], (
+        'Убедитесь, что поле is_visible публикаций в db.json совпадает '
+        'с условиями публикации: loaddata не вызывает Post.save.'
+    )
+
+
+@pytest.mark.django_db
+def test_generate_load_data_schedules_posts_by_default():
+    generate('scheduled', future_share=0.5)
+    scheduled = Post.objects.filter(
+        author__username__startswith='scheduled_', pub_date__gt=now()
+    )
+    assert scheduled.exists(), (
+        'Убедитесь, что по умолчанию даты отсчитываются от текущего '
+        'времени и часть публикаций остаётся отложенной.'
+    )
+    assert not scheduled.filter(is_visible=True).exists()
@@ -0,0 +1,43 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def lookup_queries(captured, table, field):
+    return [
+        query['sql'] for query in captured.captured_queries
+        if query['sql'].startswith(f'SELECT "{table}"."id"')
+        and f'"{table}"."{field}" =' in query['sql']
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_template, table, field', (
+    ('/category/{post.category.slug}/', 'blog_category', 'slug'),
+    ('/profile/{post.author.username}/', 'auth_user', 'username'),
+))
+def test_url_object_is_looked_up_once(
+        another_user_client, post_with_published_location, url_template,
+        table, field):
+    url = url_template.format(post=post_with_published_location)
+    with CaptureQueriesContext(connection) as captured:
+        another_user_client.get(url)
+    assert len(lookup_queries(captured, table, field)) == 1, (
+        'Убедитесь, что объект из адреса страницы запрашивается один раз.'
+    )
+    with CaptureQueriesContext(connection) as captured:
+        another_user_client.get(url)
+    assert not lookup_queries(captured, table, field), (
+        'Убедитесь, что объект из адреса страницы берётся из кэша процесса.'
+    )
+
+
+@pytest.mark.django_db
+def test_unpublished_category_lookup_is_not_stale(
+        user_client, post_with_published_location):
+    category = post_with_published_location.category
+    url = f'/category/{category.slug}/'
+    assert user_client.get(url).status_code == 200
+    category.is_published = False
+    category.save()
+    assert user_client.get(url).status_code == 404
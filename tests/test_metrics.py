@@ -0,0 +1,134 @@
+import json
+import os
+import re
+import threading
+
+import pytest
+
+from core import locks, metrics
+from core.metrics import registry
+
+
+@pytest.fixture
+def metrics_dir(settings, tmp_path):
+    settings.METRICS_DIR = tmp_path
+    settings.METRICS_ALLOWED_IPS = ['127.0.0.1']
+    return tmp_path
+
+
+def get_count(content, metric, **labels):
+    selector = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(
+        rf'^blogicum_{metric}_count\{{{selector}\}} (\d+)$',
+        content,
+        re.MULTILINE,
+    )
+    return int(match[1]) if match else 0
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint(client, metrics_dir, post_with_published_location):
+    before = client.get('/metrics/').content.decode('utf-8')
+    client.get('/')
+    client.get(f'/posts/{post_with_published_location.id}/')
+    (metrics_dir / 'other-process.json').write_text(json.dumps([{
+        'name': 'request_duration_seconds',
+        'labels': {'method': 'GET', 'status': '2xx', 'view': 'blog:index'},
+        'buckets': [1] + [0] * 10,
+        'sum': 0.001,
+        'count': 1,
+    }]))
+
+    response = client.get('/metrics/')
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    content = response.content.decode('utf-8')
+    index = {'method': 'GET', 'status': '2xx', 'view': 'blog:index'}
+    assert (
+        get_count(content, 'request_duration_seconds', **index)
+        == get_count(before, 'request_duration_seconds', **index) + 2
+    ), 'Убедитесь, что метрики суммируются по всем процессам.'
+    for metric in ('db_queries', 'template_render_seconds',
+                   'response_size_bytes'):
+        assert get_count(content, metric, view='blog:post_detail') >= 1
+    assert '_bucket{method="GET",status="2xx",view="blog:index",le="+Inf"}' in (
+        content
+    )
+    assert (metrics_dir / registry.snapshot_name).exists()
+
+
+def test_metrics_endpoint_is_local_only(client, metrics_dir):
+    response = client.get('/metrics/', REMOTE_ADDR='10.0.0.1')
+    assert response.status_code == 404
+
+
+def test_metrics_endpoint_requires_token_by_default(
+        client, settings, metrics_dir):
+    settings.METRICS_ALLOWED_IPS = []
+    assert client.get('/metrics/').status_code == 404, (
+        'Убедитесь, что по умолчанию метрики закрыты и для 127.0.0.1: '
+        'за обратным прокси с этого адреса приходят все клиенты.'
+    )
+    settings.METRICS_TOKEN = 'secret'
+    assert client.get(
+        '/metrics/', HTTP_AUTHORIZATION='Bearer wrong'
+    ).status_code == 404
+    assert client.get(
+        '/metrics/', HTTP_AUTHORIZATION='Bearer secret'
+    ).status_code == 200
+
+
+@pytest.mark.django_db
+def test_dead_process_snapshots_are_retired(client, metrics_dir):
+    entry = {
+        'name': 'request_duration_seconds',
+        'labels': {'method': 'GET', 'status': '2xx', 'view': 'blog:index'},
+        'buckets': [1] + [0] * 10,
+        'sum': 0.001,
+        'count': 1,
+    }
+    before = client.get('/metrics/').content.decode('utf-8')
+    for name in ('dead-1', 'dead-2', 'alive'):
+        (metrics_dir / f'{name}.json').write_text(json.dumps([entry]))
+    alive_lock = locks.lock_file(metrics_dir / 'alive.lock')
+    try:
+        first = client.get('/metrics/').content.decode('utf-8')
+        second = client.get('/metrics/').content.decode('utf-8')
+    finally:
+        os.close(alive_lock)
+    index = {'method': 'GET', 'status': '2xx', 'view': 'blog:index'}
+    metric = 'request_duration_seconds'
+    expected = get_count(before, metric, **index) + 3
+    assert get_count(first, metric, **index) == expected
+    assert get_count(second, metric, **index) == expected, (
+        'Убедитесь, что снимки завершившихся процессов не теряются и не '
+        'учитываются дважды.'
+    )
+    assert not list(metrics_dir.glob('dead-*')), (
+        'Убедитесь, что снимки завершившихся процессов удаляются.'
+    )
+    assert (metrics_dir / 'alive.json').exists()
+    assert (metrics_dir / metrics.RETIRED_SNAPSHOT).exists()
+    assert (metrics_dir / registry.snapshot_name).exists()
+
+
+def test_concurrent_flushes(metrics_dir):
+    registry.observe('db_queries', {'view': 'blog:index'}, 1)
+    errors = []
+
+    def flush():
+        try:
+            for _ in range(50):
+                registry.flush(force=True)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=flush) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors, (
+        'Убедитесь, что одновременные flush не мешают друг другу.'
+    )
+    assert not list(metrics_dir.glob('*.tmp'))
+    assert json.loads((metrics_dir / registry.snapshot_name).read_text())
@@ -0,0 +1,53 @@
+import pytest
+
+from blog.models import Post
+from core.nplusone import NPlusOneDetector, NPlusOneError, normalize_sql
+
+
+def test_normalize_sql():
+    assert normalize_sql(
+        "SELECT * FROM t WHERE id IN (%s, %s, %s) AND a = 'x'  LIMIT 21"
+    ) == 'SELECT * FROM t WHERE id IN (...) AND a = ? LIMIT ?'
+
+
+@pytest.mark.django_db
+def test_detector_finds_lazy_loading(many_posts_with_published_locations):
+    with NPlusOneDetector(threshold=3) as detector:
+        for post in Post.objects.all()[:5]:
+            post.category.title
+    assert len(detector.problems) == 1, detector.report()
+    shape, site, count = detector.problems[0]
+    assert count == 5
+    assert 'test_nplusone.py' in site
+
+    with NPlusOneDetector(threshold=3) as detector:
+        for post in Post.objects.select_related('category')[:5]:
+            post.category.title
+    assert not detector.problems
+
+
+@pytest.mark.nplusone
+@pytest.mark.django_db
+def test_main_pages_have_no_nplusone(
+    client, many_posts_with_published_locations, comment_to_a_post
+):
+    post = comment_to_a_post.post
+    for url in (
+        '/',
+        f'/posts/{post.id}/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+        '/search/?q=текст',
+    ):
+        assert client.get(url).status_code == 200, url
+
+
+@pytest.mark.django_db
+def test_middleware_raises_in_raise_mode(settings, client, monkeypatch):
+    settings.NPLUSONE_MODE = 'raise'
+    settings.NPLUSONE_SAMPLE_RATE = 1
+    monkeypatch.setattr(
+        NPlusOneDetector, 'problems', [('SELECT ?', 'index.html:1', 5)]
+    )
+    with pytest.raises(NPlusOneError):
+        client.get('/')
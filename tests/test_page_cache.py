@@ -0,0 +1,142 @@
+import subprocess
+import sys
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.caching import (
+    acquire_lock, get_lock_path, get_or_regenerate, make_key, release_lock
+)
+from core import locks
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_template', (
+    '/',
+    '/category/{post.category.slug}/',
+    '/profile/{post.author.username}/',
+))
+def test_anonymous_pages_are_cached_until_comment(
+        mixer, client, user_client, post_with_published_location,
+        url_template):
+    post = post_with_published_location
+    url = url_template.format(post=post)
+    first = client.get(url)
+    with CaptureQueriesContext(connection) as captured:
+        cached = client.get(url)
+    assert cached.content == first.content
+    assert not captured.captured_queries, (
+        'Убедитесь, что страница для анонимного пользователя отдаётся'
+        ' из кэша без запросов к базе данных.'
+    )
+    assert user_client.get(url).context is not None, (
+        'Убедитесь, что страницы авторизованных пользователей не кэшируются.'
+    )
+
+    mixer.blend('blog.Comment', post=post)
+    content = client.get(url).content.decode('utf-8')
+    assert 'Комментарии (1)' in content, (
+        'Убедитесь, что кэш страниц сбрасывается при добавлении комментария.'
+    )
+
+
+@pytest.mark.django_db
+def test_unknown_query_params_bypass_page_cache(
+        client, post_with_published_location):
+    client.get('/?page=1')
+    with CaptureQueriesContext(connection) as captured:
+        client.get('/?page=1')
+    assert not captured.captured_queries
+    for url in ('/?utm_source=feed', '/?page=1&x=1', '/?page=1&page=2'):
+        client.get(url)
+        with CaptureQueriesContext(connection) as captured:
+            client.get(url)
+        assert captured.captured_queries, (
+            'Убедитесь, что страницы с посторонними параметрами запроса '
+            'не сохраняются в кэш.'
+        )
+
+
+@pytest.mark.django_db
+def test_stale_page_is_served_while_another_worker_regenerates(
+        mixer, client, post_with_published_location):
+    post = post_with_published_location
+    key = make_key('blog:page', 'PostListView', '/')
+    first = client.get('/')
+    mixer.blend('blog.Comment', post=post)
+
+    assert acquire_lock(key)
+    stale = client.get('/')
+    assert stale.content == first.content, (
+        'Убедитесь, что пока страницу пересчитывает другой процесс, '
+        'отдаётся её прежняя версия.'
+    )
+    release_lock(key)
+    assert 'Комментарии (1)' in client.get('/').content.decode('utf-8')
+    assert acquire_lock(key), 'Убедитесь, что блокировка снимается.'
+
+
+@pytest.mark.django_db
+def test_missing_page_waits_for_regenerating_worker(
+        monkeypatch, client, post_with_published_location):
+    monkeypatch.setattr('blog.caching.CACHE_LOCK_WAIT', 0.1)
+    key = make_key('blog:page', 'PostListView', '/')
+    assert acquire_lock(key)
+    assert client.get('/').status_code == 200
+    assert cache.get(key) is None, (
+        'Убедитесь, что страницу сохраняет только процесс с блокировкой.'
+    )
+
+
+def test_get_or_regenerate_runs_once():
+    calls = []
+
+    def regenerate():
+        calls.append(1)
+        return f'v{len(calls)}'
+
+    assert get_or_regenerate('fragment', '1', 60, regenerate) == 'v1'
+    assert get_or_regenerate('fragment', '1', 60, regenerate) == 'v1'
+    assert acquire_lock('fragment')
+    assert get_or_regenerate('fragment', '2', 60, regenerate) == 'v1'
+    release_lock('fragment')
+    assert get_or_regenerate('fragment', '2', 60, regenerate) == 'v2'
+    assert len(calls) == 2
+
+
+@pytest.mark.skipif(not locks.SUPPORTED, reason='нужен fcntl')
+def test_lock_is_shared_between_processes(settings):
+    path = get_lock_path('blog:page:shared')
+    holder = subprocess.Popen(
+        [
+            sys.executable, '-c',
+            'import sys; from core import locks; '
+            'locks.try_lock_path(sys.argv[1]); print(flush=True); '
+            'sys.stdin.read()',
+            str(path),
+        ],
+        cwd=settings.BASE_DIR,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+    try:
+        holder.stdout.readline()
+        assert not acquire_lock('blog:page:shared'), (
+            'Убедитесь, что блокировку пересчёта, взятую другим процессом, '
+            'нельзя получить повторно.'
+        )
+    finally:
+        holder.kill()
+        holder.wait()
+    assert acquire_lock('blog:page:shared'), (
+        'Убедитесь, что блокировка завершившегося процесса снимается.'
+    )
+
+
+def test_leaked_lock_expires(monkeypatch):
+    assert acquire_lock('fragment')
+    assert not acquire_lock('fragment')
+    monkeypatch.setattr('blog.caching.CACHE_LOCK_TIMEOUT', 0)
+    assert acquire_lock('fragment')
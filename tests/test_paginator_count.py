@@ -0,0 +1,58 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+from blog.paginators import CachedCountPaginator
+from conftest import N_PER_PAGE
+
+
+def count_queries(captured):
+    return [
+        query['sql'] for query in captured.captured_queries
+        if 'COUNT(' in query['sql']
+    ]
+
+
+@pytest.mark.django_db
+def test_feed_count_is_cached_and_invalidated(
+        mixer, user_client, many_posts_with_published_locations):
+    user_client.get('/')
+    with CaptureQueriesContext(connection) as captured:
+        response = user_client.get('/')
+    assert not count_queries(captured), (
+        'Убедитесь, что количество публикаций в ленте берётся из кэша.'
+    )
+    count = response.context['paginator'].count
+
+    post = many_posts_with_published_locations[0]
+    mixer.blend(
+        'blog.Post', author=post.author, category=post.category,
+        pub_date=post.pub_date,
+    )
+    response = user_client.get('/')
+    assert response.context['paginator'].count == count + 1, (
+        'Убедитесь, что кэш количества публикаций сбрасывается'
+        ' при добавлении публикации.'
+    )
+
+
+@pytest.mark.django_db
+def test_count_query_is_stripped(many_posts_with_published_locations):
+    paginator = CachedCountPaginator(
+        Post.objects.get_posts_comment_count(), N_PER_PAGE
+    )
+    with CaptureQueriesContext(connection) as captured:
+        paginator.count
+    sql, = count_queries(captured)
+    assert 'JOIN' not in sql and 'ORDER BY' not in sql
+
+
+@pytest.mark.django_db
+def test_approximate_count(many_posts_with_published_locations):
+    paginator = CachedCountPaginator(
+        Post.objects.order_by('-pub_date'), 5, approximate_after=10
+    )
+    assert paginator.count == 10
+    assert paginator.is_approximate
+    assert paginator.page(paginator.num_pages).has_next()
@@ -0,0 +1,61 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+
+
+@pytest.mark.django_db
+def test_card_shows_stored_excerpt(user_client, post_with_published_location):
+    post = post_with_published_location
+    post.text = ' '.join(f'слово{i}' for i in range(20))
+    post.save()
+    assert post.excerpt == ' '.join(f'слово{i}' for i in range(10)) + ' …'
+
+    with CaptureQueriesContext(connection) as captured:
+        content = user_client.get('/').content.decode('utf-8')
+    assert post.excerpt in content
+    post_selects = [
+        query['sql'] for query in captured.captured_queries
+        if query['sql'].startswith('SELECT "blog_post"."id"')
+    ]
+    assert post_selects and all(
+        '"blog_post"."text"' not in sql for sql in post_selects
+    ), 'Убедитесь, что списки публикаций не загружают полный текст постов.'
+
+
+@pytest.mark.django_db
+def test_refresh_excerpts(post_with_published_location):
+    Post.objects.update(excerpt='')
+    call_command('refresh_excerpts')
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.excerpt == (
+        post_with_published_location.get_excerpt()
+    )
+
+
+@pytest.mark.django_db
+def test_card_fragment_cache(user_client, post_with_published_location):
+    post = post_with_published_location
+    assert post.title in user_client.get('/').content.decode('utf-8')
+
+    Post.objects.filter(pk=post.pk).update(title='Обновлено без save')
+    assert 'Обновлено без save' not in (
+        user_client.get('/').content.decode('utf-8')
+    ), 'Убедитесь, что карточки публикаций берутся из кэша фрагментов.'
+
+    post.title = 'Новый заголовок'
+    post.save()
+    assert 'Новый заголовок' in user_client.get('/').content.decode('utf-8')
+
+    post.category.title = 'Новая категория'
+    post.category.save()
+    assert 'Новая категория' in user_client.get('/').content.decode('utf-8')
+
+    post.author.username = 'renamed_author'
+    post.author.save()
+    assert '@renamed_author' in user_client.get('/').content.decode('utf-8')
+
+    Post.objects.filter(pk=post.pk).update(comment_count=7)
+    assert 'Комментарии (7)' in user_client.get('/').content.decode('utf-8')
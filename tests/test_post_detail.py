@@ -0,0 +1,63 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def post_queries(captured):
+    return [
+        query['sql'] for query in captured.captured_queries
+        if query['sql'].startswith('SELECT') and 'FROM "blog_post"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('client_fixture', ('user_client', 'unlogged_client'))
+def test_detail_fetches_post_once(
+        request, client_fixture, comment_to_a_post):
+    client = request.getfixturevalue(client_fixture)
+    post_id = comment_to_a_post.post_id
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(f'/posts/{post_id}/')
+    assert response.status_code == HTTPStatus.OK
+    assert len(post_queries(captured)) == 1, (
+        'Убедитесь, что страница публикации запрашивает пост'
+        ' из базы данных один раз.'
+    )
+
+
+@pytest.mark.django_db
+def test_author_sees_unpublished_post(
+        user_client, another_user_client, unpublished_posts_with_published_locations):
+    post = unpublished_posts_with_published_locations[0]
+    assert user_client.get(f'/posts/{post.id}/').status_code == HTTPStatus.OK
+    assert another_user_client.get(
+        f'/posts/{post.id}/'
+    ).status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_template', (
+    '/posts/{comment.post_id}/edit/',
+    '/posts/{comment.post_id}/delete/',
+    '/posts/{comment.post_id}/edit_comment/{comment.id}',
+    '/posts/{comment.post_id}/delete_comment/{comment.id}',
+))
+def test_author_only_views_fetch_object_once(
+        user_client, comment_to_a_post, url_template):
+    comment_to_a_post.author = comment_to_a_post.post.author
+    comment_to_a_post.save()
+    url = url_template.format(comment=comment_to_a_post)
+    with CaptureQueriesContext(connection) as captured:
+        response = user_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    table = 'blog_comment' if 'comment' in url else 'blog_post'
+    fetches = [
+        query['sql'] for query in captured.captured_queries
+        if query['sql'].startswith(f'SELECT "{table}"."id"')
+    ]
+    assert len(fetches) == 1, (
+        'Убедитесь, что страницы редактирования и удаления запрашивают'
+        ' объект из базы данных один раз.'
+    )
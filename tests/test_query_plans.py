@@ -0,0 +1,143 @@
+import re
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Post
+from conftest import N_PER_PAGE
+
+SCAN = re.compile(r'\bSCAN (\w+)(.*)$')
+# Формы публикаций и реестры процесса целиком загружают небольшие
+# справочники.
+FORM_CHOICES = re.compile(
+    r'FROM "(blog_category|blog_location)"( ORDER BY|$)'
+)
+TEMP_B_TREE = 'USE TEMP B-TREE'
+
+
+@pytest.fixture
+def blog_data(mixer, user, another_user, published_category,
+              published_location):
+    posts = mixer.cycle(N_PER_PAGE * 2 + 1).blend(
+        'blog.Post',
+        author=mixer.sequence(user, another_user),
+        category=published_category,
+        location=published_location,
+    )
+    comments = mixer.cycle(N_PER_PAGE).blend(
+        'blog.Comment', post=posts[0], author=user
+    )
+    return posts, comments
+
+
+def get_urls(user, posts, comments, published_category):
+    post, comment = posts[0], comments[0]
+    return (
+        '/',
+        '/?page=2',
+        f'/category/{published_category.slug}/',
+        f'/category/{published_category.slug}/?page=2',
+        f'/profile/{user.username}/',
+        f'/profile/{user.username}/?page=2',
+        f'/profile/{posts[1].author.username}/',
+        f'/posts/{post.id}/',
+        f'/posts/{post.id}/?page=2',
+        f'/posts/{post.id}/edit/',
+        f'/posts/{post.id}/delete/',
+        f'/posts/{post.id}/edit_comment/{comment.id}',
+        f'/posts/{post.id}/delete_comment/{comment.id}',
+    )
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def is_full_scan(step, tables):
+    match = SCAN.search(step)
+    return bool(match) and match[1] in tables and 'USING' not in match[2]
+
+
+def check_plans(captured):
+    tables = set(connection.introspection.table_names())
+    for query in captured.captured_queries:
+        sql = query['sql']
+        if (
+            not sql.startswith(('SELECT', 'UPDATE', 'DELETE'))
+            or FORM_CHOICES.search(sql)
+        ):
+            continue
+        for step in explain(sql):
+            assert not is_full_scan(step, tables), (
+                f'Запрос выполняет полный просмотр таблицы: {step}\n{sql}'
+            )
+            assert TEMP_B_TREE not in step, (
+                f'Запрос сортирует во временном B-дереве: {step}\n{sql}'
+            )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('client_fixture', (
+    'user_client', 'another_user_client', 'unlogged_client'
+))
+def test_view_query_plans(request, client_fixture, user, blog_data,
+                          published_category):
+    client = request.getfixturevalue(client_fixture)
+    posts, comments = blog_data
+    for url in get_urls(user, posts, comments, published_category):
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(url)
+        assert response.status_code < HTTPStatus.INTERNAL_SERVER_ERROR
+        check_plans(captured)
+        if response.status_code == HTTPStatus.OK and response.context:
+            page = response.context.get('page_obj')
+            cursor = getattr(page, 'next_cursor', None)
+            if cursor:
+                with CaptureQueriesContext(connection) as captured:
+                    client.get(f'{url.split("?")[0]}?cursor={cursor}')
+                check_plans(captured)
+
+
+@pytest.mark.django_db
+def test_add_comment_query_plans(user_client, blog_data):
+    posts, _ = blog_data
+    with CaptureQueriesContext(connection) as captured:
+        user_client.post(
+            f'/posts/{posts[0].id}/comment/', {'text': 'Комментарий'}
+        )
+    check_plans(captured)
+
+
+@pytest.mark.django_db
+def test_scheduler_query_plans(blog_data, future_posts, published_category):
+    Post.objects.filter(pk=future_posts[0].pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1),
+        category=published_category,
+    )
+    with CaptureQueriesContext(connection) as captured:
+        call_command('publish_scheduled_posts', stdout=StringIO())
+        Post.objects.next_pub_date()
+    assert any(
+        query['sql'].startswith('UPDATE')
+        for query in captured.captured_queries
+    )
+    check_plans(captured)
+
+
+@pytest.mark.django_db
+def test_category_save_and_delete_query_plans(blog_data, published_category):
+    published_category.is_published = False
+    with CaptureQueriesContext(connection) as captured:
+        published_category.save()
+    check_plans(captured)
+    with CaptureQueriesContext(connection) as captured:
+        published_category.delete()
+    check_plans(captured)
@@ -0,0 +1,71 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Category, Post
+
+
+def tables_queries(captured, table):
+    return [
+        query['sql'] for query in captured.captured_queries
+        if f'"{table}"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db
+def test_list_attaches_categories_and_locations_from_registry(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.get('/')
+    with CaptureQueriesContext(connection) as captured:
+        content = user_client.get('/').content.decode('utf-8')
+    assert post.category.title in content
+    assert post.location.name in content
+    for table in ('blog_category', 'blog_location'):
+        assert not tables_queries(captured, table), (
+            'Убедитесь, что категории и местоположения публикаций в списках '
+            'берутся из реестра процесса без JOIN и отдельных запросов.'
+        )
+
+    with CaptureQueriesContext(connection) as captured:
+        listed = list(Post.objects.get_post_cards())
+    assert listed[0].category == post.category
+    assert listed[0].location == post.location
+    assert len(captured) == 1
+
+
+@pytest.mark.django_db
+def test_registry_reloads_after_save(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.get('/')
+    post.category.title = 'Переименованная категория'
+    post.category.save()
+    post.location.name = 'Переименованное место'
+    post.location.save()
+    content = user_client.get('/').content.decode('utf-8')
+    assert 'Переименованная категория' in content
+    assert 'Переименованное место' in content
+
+
+@pytest.mark.django_db
+def test_registry_notices_changes_from_other_processes(
+        monkeypatch, user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.get('/')
+    # Сохранение в другом процессе с отдельным кэшем не сбрасывает
+    # поколение GLOBAL в кэше этого процесса.
+    Category.objects.filter(pk=post.category.pk).update(
+        title='Изменено в другом процессе', updated_at=timezone.now()
+    )
+    assert 'Изменено в другом процессе' not in (
+        user_client.get('/').content.decode('utf-8')
+    )
+    monkeypatch.setattr('blog.registry.REGISTRY_CHECK_INTERVAL', 0)
+    assert 'Изменено в другом процессе' in (
+        user_client.get('/').content.decode('utf-8')
+    ), (
+        'Убедитесь, что реестр периодически сверяется с базой и '
+        'перезагружается при изменениях из других процессов.'
+    )
@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+
+
+@pytest.mark.django_db
+def test_scheduled_post_goes_live(client, future_posts):
+    post = future_posts[0]
+    assert not Post.objects.get(pk=post.pk).is_visible
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    assert client.get(f'/posts/{post.pk}/').status_code == 404
+
+    call_command('publish_scheduled_posts')
+
+    assert Post.objects.get(pk=post.pk).is_visible, (
+        'Убедитесь, что команда `publish_scheduled_posts` открывает доступ'
+        ' к отложенным публикациям, время которых наступило.'
+    )
+    assert client.get(f'/posts/{post.pk}/').status_code == 200
+
+
+@pytest.mark.django_db
+def test_unpublished_category_hides_posts(post_with_published_location):
+    category = post_with_published_location.category
+    assert Post.objects.filter_posts().filter(
+        pk=post_with_published_location.pk
+    ).exists()
+    category.is_published = False
+    category.save()
+    assert not Post.objects.filter_posts().filter(
+        pk=post_with_published_location.pk
+    ).exists(), (
+        'Убедитесь, что публикации скрываются при снятии категории'
+        ' с публикации.'
+    )
+    assert Post.objects.next_pub_date() is None
@@ -0,0 +1,60 @@
+import pytest
+from django.db import connection
+
+from blog.models import Post
+from blog.search import build_match_query, restore_search_triggers
+
+
+def test_match_query_quotes_user_input():
+    assert build_match_query('title:x OR "y" NEAR(z') == (
+        '"title" "x" "OR" "y" "NEAR" "z"*'
+    )
+    assert build_match_query(' -*() ') == ''
+
+
+@pytest.mark.django_db
+def test_search_ranks_visible_posts(
+        client, mixer, user, published_category, published_location):
+    def make_post(**kwargs):
+        return mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            location=published_location, **kwargs
+        )
+
+    in_text = make_post(title='Заметки', text='Поход по горам Алтая')
+    in_title = make_post(title='Горы Алтая', text='Фотографии')
+    make_post(title='Алтай', text='Горы', is_published=False)
+    make_post(title='Море', text='Отпуск у моря')
+
+    response = client.get('/search/', {'q': 'алтая'})
+    assert list(response.context['page_obj']) == [in_title, in_text]
+
+    in_text.text = 'Поход по морю'
+    in_text.save()
+    assert list(Post.objects.filter_posts().search('алта')) == [in_title]
+    in_title.delete()
+    assert not Post.objects.search('алтая').exists()
+    assert client.get('/search/', {'q': 'NEAR('}).status_code == 200
+
+
+@pytest.mark.django_db(transaction=True)
+def test_search_triggers_are_restored(post_with_published_location):
+    with connection.cursor() as cursor:
+        cursor.execute('DROP TRIGGER blog_post_fts_update')
+    post = post_with_published_location
+    post.title = 'Уникальныйзаголовок'
+    post.save()
+    assert restore_search_triggers(connection)
+    assert list(Post.objects.matching('уникальныйзаголовок')) == [post]
+    assert not restore_search_triggers(connection)
+
+
+@pytest.mark.django_db
+def test_search_is_driven_by_index():
+    queryset = Post.objects.get_post_cards().filter_posts().search('горы')
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        plan = [row[-1] for row in cursor.fetchall()]
+    assert plan[0].startswith('SCAN blog_post_fts VIRTUAL TABLE INDEX')
+    assert 'SEARCH blog_post USING INTEGER PRIMARY KEY (rowid=?)' in plan
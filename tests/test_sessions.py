@@ -0,0 +1,87 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+
+
+def session_queries(captured):
+    return [
+        query['sql'] for query in captured.captured_queries
+        if '"django_session"' in query['sql']
+    ]
+
+
+@pytest.fixture
+def local_sessions(settings):
+    settings.SESSION_ENGINE = 'core.sessions.cached_db'
+
+
+@pytest.mark.django_db
+def test_cached_sessions_skip_database(local_sessions, user):
+    client = Client()
+    client.force_login(user)
+    client.get('/pages/about/')
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get('/pages/about/')
+    assert response.context['user'] == user
+    assert not session_queries(captured), (
+        'Убедитесь, что при SESSION_ENGINE=core.sessions.cached_db '
+        'повторный запрос авторизованного пользователя не обращается '
+        'к таблице сессий.'
+    )
+
+
+@pytest.mark.django_db
+def test_cached_sessions_logout(local_sessions, user):
+    client = Client()
+    client.force_login(user)
+    session_key = client.session.session_key
+    client.post('/auth/logout/')
+    assert not Session.objects.filter(pk=session_key).exists()
+    client.cookies['sessionid'] = session_key
+    response = client.get('/pages/about/')
+    assert not response.context['user'].is_authenticated
+
+
+@pytest.mark.django_db
+def test_clearsessions_in_batches():
+    expired = [
+        Session(
+            session_key=f'expired{number}',
+            session_data='',
+            expire_date=now() - timedelta(days=1),
+        )
+        for number in range(5)
+    ]
+    live = Session(
+        session_key='live',
+        session_data='',
+        expire_date=now() + timedelta(days=1),
+    )
+    Session.objects.bulk_create([*expired, live])
+    stdout = StringIO()
+    call_command('clearsessions', batch_size=2, pause=0, stdout=stdout)
+    assert list(Session.objects.values_list('pk', flat=True)) == ['live']
+    assert 'Удалено истёкших сессий: 5' in stdout.getvalue()
+
+
+@pytest.mark.django_db
+def test_bench_sessions(user):
+    stdout = StringIO()
+    call_command(
+        'bench_sessions', requests=5, warmup=1, username=user.username,
+        stdout=stdout,
+    )
+    lines = stdout.getvalue().splitlines()
+    assert [line.split()[0] for line in lines[1:]] == [
+        'db', 'cached_db', 'cached_db_local', 'signed_cookies',
+    ]
+    assert lines[1].split()[-1] == '1.00'
+    assert lines[3].split()[-1] == '0.00'
+    assert not Session.objects.exists()
@@ -0,0 +1,27 @@
+from importlib import import_module
+from io import StringIO
+
+from django.core.management import call_command
+
+
+def test_prod_profile():
+    dev = import_module('blogicum.settings.dev')
+    prod = import_module('blogicum.settings.prod')
+    assert dev.DEBUG and 'debug_toolbar' in dev.INSTALLED_APPS
+    assert not prod.DEBUG
+    assert 'debug_toolbar' not in prod.INSTALLED_APPS
+    assert not any('debug_toolbar' in item for item in prod.MIDDLEWARE)
+    options = prod.TEMPLATES[0]['OPTIONS']
+    assert options['loaders'][0][0] == (
+        'django.template.loaders.cached.Loader'
+    ), 'Убедитесь, что в prod шаблоны загружаются через кэширующий загрузчик.'
+    assert not prod.TEMPLATES[0]['APP_DIRS']
+    assert prod.STATICFILES_STORAGE.endswith('ManifestStaticFilesStorage')
+
+
+def test_bench_startup():
+    stdout = StringIO()
+    call_command('bench_startup', runs=1, requests=0, stdout=stdout)
+    output = stdout.getvalue()
+    assert 'dev: запуск' in output
+    assert 'prod: запуск' in output
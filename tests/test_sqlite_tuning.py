@@ -0,0 +1,24 @@
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+def test_sqlite_pragmas_are_applied():
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous')
+        assert cursor.fetchone()[0] == 1
+        cursor.execute('PRAGMA temp_store')
+        assert cursor.fetchone()[0] == 2
+        cursor.execute('PRAGMA busy_timeout')
+        assert cursor.fetchone()[0] == 5000
+
+
+@pytest.mark.django_db(transaction=True)
+def test_atomic_blocks_take_write_lock_upfront():
+    with CaptureQueriesContext(connection) as captured:
+        with transaction.atomic():
+            pass
+    assert captured.captured_queries[0]['sql'] == 'BEGIN IMMEDIATE', (
+        'Убедитесь, что транзакции SQLite сразу берут блокировку записи.'
+    )
@@ -0,0 +1,49 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.fixture
+def authors(mixer):
+    first, second, third = mixer.cycle(3).blend('auth.User')
+    mixer.cycle(12).blend('blog.Post', author=first)
+    post = mixer.blend('blog.Post', author=second)
+    mixer.cycle(6).blend('blog.Comment', author=second, post=post)
+    return first, second, third
+
+
+def get_usernames(admin_client, query=''):
+    response = admin_client.get(f'/admin/auth/user/{query}')
+    assert response.status_code == 200
+    return [user.username for user in response.context['cl'].result_list]
+
+
+@pytest.mark.django_db
+def test_user_admin_counts(admin_client, authors, mixer):
+    first, second, third = authors
+    with CaptureQueriesContext(connection) as few_users:
+        admin_client.get('/admin/auth/user/')
+    commenter = mixer.blend('auth.User')
+    mixer.cycle(5).blend('blog.Comment', author=commenter)
+    with CaptureQueriesContext(connection) as more_users:
+        response = admin_client.get('/admin/auth/user/')
+    assert len(more_users) == len(few_users), (
+        'Убедитесь, что количество постов и комментариев пользователей '
+        'загружается одним запросом для всей страницы.'
+    )
+    counts = {
+        user.username: (user.posts_count, user.comments_count)
+        for user in response.context['cl'].result_list
+    }
+    assert counts[first.username] == (12, 0)
+    assert counts[second.username] == (1, 6)
+    assert counts[third.username] == (0, 0)
+
+    assert get_usernames(admin_client, '?o=-5')[0] == first.username
+    assert get_usernames(admin_client, '?o=-6')[0] == second.username
+    assert get_usernames(admin_client, '?posts_count=10-99') == [
+        first.username
+    ]
+    assert set(get_usernames(admin_client, '?comments_count=1-9')) == {
+        second.username, commenter.username
+    }